@@ -2,7 +2,7 @@
 from .types import StateSnapshot, Proposal, Decision, Action, ExecResult
 from .gate import gate
 from .controller import execute_decision
-from .ledger import append_ledger
+from .ledger import append_ledger, LedgerWriter
 from .replay import verify_ledger_chain, verify_gate_determinism
 from .patch_safety import parse_unified_diff_files, patch_paths_are_confined
 
@@ -15,6 +15,7 @@ __all__ = [
     "gate",
     "execute_decision",
     "append_ledger",
+    "LedgerWriter",
     "verify_ledger_chain",
     "verify_gate_determinism",
     "parse_unified_diff_files",
@@ -5,16 +5,31 @@ Execute approved actions from the gate.
 Security hardening:
 - Realpath confinement checks (defense in depth)
 - Write byte caps
-- git apply --check before apply (no .rej pollution)
+- Atomic git apply (no --reject, so no .rej pollution or partial applies)
+
+The workspace is realpath-resolved once per decision; the _* helpers below
+take that resolved root (ws) and do not re-resolve it.
 """
 from __future__ import annotations
 
+import base64
+import errno
+import functools
+import json
 import os
+import select
+import shutil
+import signal
+import stat
 import subprocess
-from typing import Any, Dict, List, Optional, Tuple
-
-from .types import StateSnapshot, Decision, ExecResult, verify_decision_sig
-from .gate import is_allowed_tests_argv
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .types import Action, StateSnapshot, Decision, ExecResult, verify_decision_sig
+from .gate import _is_confined_relative, is_allowed_tests_argv
 from .patch_safety import patch_paths_are_confined
 
 
@@ -25,6 +40,75 @@ _MAX_GREP_RESULTS = 100
 _MAX_GREP_OUTPUT_BYTES = 512_000
 _MAX_LIST_DIR_ENTRIES = 500
 _MAX_GIT_DIFF_BYTES = 512_000
+_GREP_TIMEOUT_S = 30
+_MAX_GREP_STDERR_BYTES = 4000
+_MAX_PATCH_OUTPUT_BYTES = 4000
+# Pipe buffer size for Popen and chunk size for draining it; the 8 KiB
+# default costs a read() syscall per 8 KiB of chatty test/grep output.
+_PIPE_READ_CHUNK = 64 * 1024
+
+# GREP file filters (code + config + docs) and directory excludes (noise + security)
+_GREP_INCLUDES = (
+    "*.py", "*.txt", "*.md", "*.rst",
+    "*.json", "*.yaml", "*.yml", "*.toml",
+    "*.js", "*.ts", "*.jsx", "*.tsx",
+    "*.java", "*.go", "*.rs", "*.c", "*.h", "*.cpp",
+    "*.html", "*.css", "*.sh",
+)
+_GREP_EXCLUDE_DIRS = (
+    ".git", "__pycache__", "node_modules",
+    ".venv", "venv", ".env",
+    "dist", "build", ".next", ".cache",
+    "coverage", "htmlcov", ".pytest_cache",
+    ".mypy_cache", ".ruff_cache",
+)
+
+# Filter argv tails, built once rather than on every GREP
+_GNU_GREP_FILTER_ARGS = (
+    *(f"--include={inc}" for inc in _GREP_INCLUDES),
+    *(f"--exclude-dir={exc}" for exc in _GREP_EXCLUDE_DIRS),
+)
+_RG_FILTER_ARGS = (
+    "--json", "--no-messages", "--no-ignore", "--hidden", "--sort=path",
+    f"--max-count={_MAX_GREP_RESULTS}",
+    *(arg for inc in _GREP_INCLUDES for arg in ("-g", inc)),
+    *(arg for exc in _GREP_EXCLUDE_DIRS for arg in ("-g", f"!{exc}/")),
+)
+
+# Read-only git commands must not take index.lock for opportunistic index
+# refreshes; that serializes concurrent GIT_DIFF actions against each other.
+_GIT_NO_LOCKS_ENV = {"GIT_OPTIONAL_LOCKS": "0"}
+
+# ripgrep is preferred for GREP when installed; GNU grep is the fallback.
+_RG_BIN = shutil.which("rg")
+
+# O_NOFOLLOW: callers pass an already-resolved realpath, so a symlink showing up
+# at the final component means it was swapped in after the confinement check.
+_READ_OPEN_FLAGS = (
+    os.O_RDONLY
+    | getattr(os, "O_NOFOLLOW", 0)
+    | getattr(os, "O_CLOEXEC", 0)
+    | getattr(os, "O_BINARY", 0)
+)
+_WRITE_OPEN_FLAGS = (
+    os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    | getattr(os, "O_NOFOLLOW", 0)
+    | getattr(os, "O_CLOEXEC", 0)
+    | getattr(os, "O_BINARY", 0)
+)
+
+# READ_FILE cache: decoded text keyed by the open file's identity and
+# modification stamps, bounded by total source bytes. Keys come from fstat
+# on the already-opened fd, so a hit always matches the file actually opened.
+# Timestamps only move once per kernel tick (or per 2 s on some filesystems),
+# so a same-size rewrite within that window keeps the key: like git's
+# "racily clean" index entries, files modified that recently are not cached,
+# and the controller's own writes evict the file explicitly.
+_READ_CACHE_MAX_BYTES = 16 * 1024 * 1024
+_READ_CACHE_RACY_NS = 2_000_000_000
+_READ_CACHE: "OrderedDict[Tuple[str, int, int, int, int, int], Tuple[int, str]]" = OrderedDict()
+_READ_CACHE_BYTES = 0
+_READ_CACHE_LOCK = threading.Lock()
 
 # Test execution mode:
 # - "host": run pytest on host (default)
@@ -52,32 +136,36 @@ def _get_test_mode(payload: dict[str, Any]) -> str:
     return _DEFAULT_TEST_MODE
 
 
-def _realpath_in_workspace(workspace: str, user_path: str) -> bool:
+def _resolve_in_workspace(ws: str, user_path: str) -> Optional[str]:
     """
-    Realpath-based confinement check.
+    Realpath-based confinement check against an already-resolved workspace root.
     Prevents escaping via symlinks inside workspace.
+    Returns the resolved target path, or None if it escapes.
     """
-    ws = os.path.realpath(workspace)
     target = os.path.realpath(os.path.join(ws, user_path))
-    try:
-        return os.path.commonpath([ws, target]) == ws
-    except ValueError:
-        return False
-
-
-def _is_confined_relative(p: str) -> bool:
-    """Check that path is relative and has no traversal."""
-    p = p.strip().replace("\\", "/")
-    if not p:
-        return False
-    if p.startswith("/") or p.startswith("~"):
-        return False
-    if ":" in p.split("/")[0]:
-        return False
-    segs = [s for s in p.split("/") if s not in ("", ".")]
-    if any(s == ".." for s in segs):
-        return False
-    return True
+    if target == ws or target.startswith(ws if ws.endswith(os.sep) else ws + os.sep):
+        return target
+    return None
+
+
+def _resolve_parent_in_workspace(ws: str, user_path: str) -> Optional[str]:
+    """
+    Like _resolve_in_workspace, but only resolves the parent directory and
+    leaves the final component unresolved (one lstat fewer for new files).
+    The result must be opened with O_NOFOLLOW so a final-component symlink
+    cannot be followed unchecked.
+    """
+    parent, base = os.path.split(user_path)
+    if base in ("", ".", ".."):
+        return _resolve_in_workspace(ws, user_path)
+    parent_real = _resolve_in_workspace(ws, parent or ".")
+    if parent_real is None:
+        return None
+    return os.path.join(parent_real, base)
+
+
+def _realpath_in_workspace(ws: str, user_path: str) -> bool:
+    return _resolve_in_workspace(ws, user_path) is not None
 
 
 def _tail(s: str, n: int) -> str:
@@ -86,32 +174,223 @@ def _tail(s: str, n: int) -> str:
     return s[-n:]
 
 
+def _tail_bytes(b: bytes, n: int) -> bytes:
+    """
+    Last n bytes of b, advanced past any UTF-8 continuation bytes so the
+    slice never starts mid-character. Tailing before decoding keeps decoder
+    work proportional to what is kept, not to what the child printed.
+    """
+    if len(b) <= n:
+        return b
+    start = len(b) - n
+    # At most 3 continuation bytes (10xxxxxx) precede a character boundary
+    limit = min(start + 3, len(b))
+    while start < limit and (b[start] & 0xC0) == 0x80:
+        start += 1
+    return b[start:]
+
+
+def _drain_tail(stream: Any, cap_bytes: int, out: List[bytes]) -> None:
+    """Read a pipe to EOF, keeping only its last cap_bytes, then close it."""
+    buf = bytearray()
+    try:
+        for chunk in iter(lambda: stream.read(_PIPE_READ_CHUNK), b""):
+            buf += chunk
+            if len(buf) > 2 * cap_bytes:
+                del buf[:-cap_bytes]
+    finally:
+        stream.close()
+    out.append(bytes(buf[-cap_bytes:]) if cap_bytes else b"")
+
+
+# After killing a timed-out process group, how long to wait for the pipe
+# readers. Descendants that left the group (setsid) can keep a pipe open
+# indefinitely; their readers are abandoned (daemon threads) rather than
+# letting them hold up the timeout.
+_KILL_DRAIN_GRACE_S = 1.0
+
+
+def _kill_group(proc: "subprocess.Popen[bytes]") -> None:
+    """SIGKILL the child's process group (it leads its own session)."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        proc.kill()
+
+
+def _wait_child(proc: "subprocess.Popen[bytes]", timeout_s: Optional[float]) -> int:
+    """
+    Wait for proc, raising subprocess.TimeoutExpired after timeout_s.
+
+    Popen.wait(timeout=...) polls with a sleep backoff; where Linux pidfds
+    are available we block in poll() on the pidfd instead and wake exactly
+    when the child exits.
+    """
+    if timeout_s is None or not hasattr(os, "pidfd_open"):
+        return proc.wait(timeout=timeout_s)
+    try:
+        pidfd = os.pidfd_open(proc.pid)
+    except OSError:
+        # Already reaped, or the kernel lacks pidfd support
+        return proc.wait(timeout=timeout_s)
+    try:
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        if not poller.poll(max(0, int(timeout_s * 1000))):
+            raise subprocess.TimeoutExpired(proc.args, timeout_s)
+    finally:
+        os.close(pidfd)
+    return proc.wait()
+
+
+def _run_capped(
+    argv: List[str],
+    *,
+    cwd: str,
+    cap_bytes: int,
+    timeout_s: Optional[float] = None,
+    input_bytes: Optional[bytes] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> Tuple[int, bytes, bytes]:
+    """
+    Run argv and return (returncode, stdout_tail, stderr_tail).
+
+    Both pipes are drained while the child runs and only the last cap_bytes
+    of each is retained, so memory stays bounded however chatty the child is.
+    The child leads a new session; on timeout its whole process group is
+    killed. timeout_s covers both the child's exit and EOF on its pipes, so
+    a background grandchild holding a pipe open cannot outlast it.
+    Raises subprocess.TimeoutExpired (after the kill) on timeout.
+    env entries, if given, are layered over the current environment.
+    """
+    deadline = None if timeout_s is None else time.monotonic() + timeout_s
+    proc = subprocess.Popen(
+        argv,
+        cwd=cwd,
+        bufsize=_PIPE_READ_CHUNK,
+        env={**os.environ, **env} if env else None,
+        stdin=subprocess.PIPE if input_bytes is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    out: List[bytes] = []
+    err: List[bytes] = []
+    readers = [
+        threading.Thread(target=_drain_tail, args=(proc.stdout, cap_bytes, out), daemon=True),
+        threading.Thread(target=_drain_tail, args=(proc.stderr, cap_bytes, err), daemon=True),
+    ]
+    for t in readers:
+        t.start()
+    try:
+        if input_bytes is not None:
+            assert proc.stdin is not None
+            try:
+                proc.stdin.write(input_bytes)
+            except BrokenPipeError:
+                pass
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+        returncode = _wait_child(proc, timeout_s)
+        for t in readers:
+            t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if t.is_alive():
+                raise subprocess.TimeoutExpired(proc.args, timeout_s)
+    except BaseException:
+        _kill_group(proc)
+        proc.wait()
+        for t in readers:
+            t.join(_KILL_DRAIN_GRACE_S)
+        raise
+    return returncode, out[0], err[0]
+
+
 def _read_file(path: str, cap_bytes: int = _MAX_READ_BYTES) -> str:
-    with open(path, "rb") as f:
-        data = f.read(cap_bytes + 1)
+    global _READ_CACHE_BYTES
+    fd = os.open(path, _READ_OPEN_FLAGS)
+    try:
+        st = os.fstat(fd)
+        key = (path, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        if st.st_size > cap_bytes and stat.S_ISREG(st.st_mode):
+            # Known oversize: reject without reading (pipes/devices report 0)
+            raise RuntimeError(f"read cap exceeded: {cap_bytes} bytes")
+        if st.st_size <= cap_bytes:
+            with _READ_CACHE_LOCK:
+                hit = _READ_CACHE.get(key)
+                if hit is not None:
+                    _READ_CACHE.move_to_end(key)
+                    return hit[1]
+        chunks: List[bytes] = []
+        remaining = cap_bytes + 1
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    finally:
+        os.close(fd)
+    data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
     if len(data) > cap_bytes:
         raise RuntimeError(f"read cap exceeded: {cap_bytes} bytes")
-    return data.decode("utf-8", errors="replace")
+    text = data.decode("utf-8", errors="replace")
+    # Only cache when the bytes read agree with the stat the key came from,
+    # and the file is not racily recent
+    racy = max(st.st_mtime_ns, st.st_ctime_ns) >= time.time_ns() - _READ_CACHE_RACY_NS
+    if len(data) == st.st_size and not racy:
+        with _READ_CACHE_LOCK:
+            if key not in _READ_CACHE:
+                _READ_CACHE[key] = (len(data), text)
+                _READ_CACHE_BYTES += len(data)
+                while _READ_CACHE_BYTES > _READ_CACHE_MAX_BYTES:
+                    _, (nbytes, _) = _READ_CACHE.popitem(last=False)
+                    _READ_CACHE_BYTES -= nbytes
+    return text
+
+
+def _evict_read_cache(*, path: Optional[str] = None, dev_ino: Optional[Tuple[int, int]] = None) -> None:
+    """Drop cached READ_FILE entries for a path and/or a (dev, inode)."""
+    global _READ_CACHE_BYTES
+    with _READ_CACHE_LOCK:
+        stale = [
+            k for k in _READ_CACHE
+            if k[0] == path or (k[1], k[2]) == dev_ino
+        ]
+        for k in stale:
+            _READ_CACHE_BYTES -= _READ_CACHE.pop(k)[0]
 
 
 def _write_file(path: str, text: str, cap_bytes: int = _MAX_WRITE_BYTES) -> int:
-    nbytes = len(text.encode("utf-8", errors="replace"))
+    # Encode once: the same buffer is measured against the cap and written.
+    data = text.encode("utf-8", errors="replace")
+    nbytes = len(data)
     if nbytes > cap_bytes:
         raise RuntimeError(f"write cap exceeded: {nbytes} > {cap_bytes}")
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(text)
+    # O_NOFOLLOW: callers may pass a path whose final component is unresolved
+    fd = os.open(path, _WRITE_OPEN_FLAGS, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        st = os.fstat(fd)
+    finally:
+        os.close(fd)
+    _evict_read_cache(path=path, dev_ino=(st.st_dev, st.st_ino))
     return nbytes
 
 
-def _apply_patch_minimal(workspace: str, patch: str) -> Dict[str, Any]:
+def _apply_patch_minimal(ws: str, patch: str) -> Dict[str, Any]:
     """
     Minimal safe patching:
     - Only supports unified diff against files inside workspace
-    - Uses git apply --check first to avoid .rej pollution
-    - Calls git apply only if check passes
+    - Single git apply without --reject: git checks every hunk before
+      writing anything, so a failing patch leaves the tree untouched
+      (no .rej files, no partial apply) without a separate --check pass
     """
-    ws = os.path.realpath(workspace)
     if not os.path.isdir(os.path.join(ws, ".git")):
         return {"applied": False, "reason": "workspace is not a git repo (.git missing)"}
 
@@ -120,43 +399,43 @@ def _apply_patch_minimal(workspace: str, patch: str) -> Dict[str, Any]:
     if not ok:
         return {"applied": False, "reason": f"patch rejected: {reason}"}
 
-    # First: verify patch applies cleanly (no .rej files)
-    check = subprocess.run(
-        ["git", "apply", "--check", "--whitespace=nowarn", "-"],
-        input=patch.encode("utf-8", errors="replace"),
-        cwd=ws,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    if check.returncode != 0:
-        return {
-            "applied": False,
-            "reason": "patch failed git apply --check",
-            "returncode": check.returncode,
-            "stdout": _tail(check.stdout.decode("utf-8", errors="replace"), 4000),
-            "stderr": _tail(check.stderr.decode("utf-8", errors="replace"), 4000),
-            "touched_files": [{"old": f.old_path, "new": f.new_path} for f in files],
-        }
-
-    # Apply cleanly (no --reject)
-    proc = subprocess.run(
+    rc, out, err = _run_capped(
         ["git", "apply", "--whitespace=nowarn", "-"],
-        input=patch.encode("utf-8", errors="replace"),
         cwd=ws,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        cap_bytes=_MAX_PATCH_OUTPUT_BYTES,
+        input_bytes=patch.encode("utf-8", errors="replace"),
+        env=_GIT_NO_LOCKS_ENV,
     )
-    return {
-        "applied": proc.returncode == 0,
-        "returncode": proc.returncode,
-        "stdout": _tail(proc.stdout.decode("utf-8", errors="replace"), 4000),
-        "stderr": _tail(proc.stderr.decode("utf-8", errors="replace"), 4000),
+    # git apply rewrites touched files: drop their cached reads (even on a
+    # failed apply, which should leave the tree untouched, to be safe)
+    for f in files:
+        for rel in (f.old_path, f.new_path):
+            if rel and rel != "/dev/null":
+                _evict_read_cache(path=os.path.realpath(os.path.join(ws, rel)))
+    result: Dict[str, Any] = {
+        "applied": rc == 0,
+        "returncode": rc,
+        "stdout": _tail_bytes(out, _MAX_PATCH_OUTPUT_BYTES).decode("utf-8", errors="replace"),
+        "stderr": _tail_bytes(err, _MAX_PATCH_OUTPUT_BYTES).decode("utf-8", errors="replace"),
         "touched_files": [{"old": f.old_path, "new": f.new_path} for f in files],
     }
+    if rc != 0:
+        result["reason"] = "patch failed git apply"
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def _sandbox_runner() -> Callable[..., Dict[str, Any]]:
+    """
+    Lazy import to avoid breaking host-only deployments; resolved once.
+    ImportError is not cached, so a later install is picked up.
+    """
+    from docker_runner import run_tests_sandboxed
+    return run_tests_sandboxed
 
 
 def _run_tests(
-    workspace: str,
+    ws: str,
     argv: List[str],
     timeout_s: int = 600,
     mode: str = "host",
@@ -165,7 +444,7 @@ def _run_tests(
     Execute tests with configurable execution mode.
 
     Args:
-        workspace: Path to workspace
+        ws: Realpath-resolved workspace
         argv: Test command, e.g. ["pytest", "-q"]
         timeout_s: Timeout in seconds
         mode: "host" (default) or "docker" for sandboxed execution
@@ -173,15 +452,12 @@ def _run_tests(
     Returns:
         Dict with ok, returncode, stdout, stderr, mode
     """
-    if not is_allowed_tests_argv(argv, workspace=workspace):
+    if not is_allowed_tests_argv(argv, workspace=ws):
         raise RuntimeError("RUN_TESTS argv failed allowlist re-check")
 
-    ws = os.path.realpath(workspace)
-
     if mode == "docker":
-        # Lazy import to avoid breaking host-only deployments
         try:
-            from docker_runner import run_tests_sandboxed
+            run_tests_sandboxed = _sandbox_runner()
         except ImportError as e:
             return {
                 "ok": False,
@@ -203,23 +479,143 @@ def _run_tests(
         return result
     else:
         # Host mode (default)
-        proc = subprocess.run(
+        rc, out, err = _run_capped(
             argv,
             cwd=ws,
-            capture_output=True,
-            timeout=timeout_s,
+            cap_bytes=_MAX_TEST_OUTPUT_CHARS,
+            timeout_s=timeout_s,
         )
         return {
-            "returncode": proc.returncode,
-            "stdout": _tail(proc.stdout.decode("utf-8", errors="replace"), _MAX_TEST_OUTPUT_CHARS),
-            "stderr": _tail(proc.stderr.decode("utf-8", errors="replace"), _MAX_TEST_OUTPUT_CHARS),
-            "ok": proc.returncode == 0,
+            "returncode": rc,
+            "stdout": _tail_bytes(out, _MAX_TEST_OUTPUT_CHARS).decode("utf-8", errors="replace"),
+            "stderr": _tail_bytes(err, _MAX_TEST_OUTPUT_CHARS).decode("utf-8", errors="replace"),
+            "ok": rc == 0,
             "mode": "host",
         }
 
 
+def _rg_text(obj: Dict[str, Any]) -> str:
+    """Decode a ripgrep JSON "arbitrary data" object ({"text": ...} or {"bytes": base64})."""
+    text = obj.get("text")
+    if isinstance(text, str):
+        return text
+    return base64.b64decode(obj.get("bytes", "")).decode("utf-8", errors="replace")
+
+
+def _stream_grep_lines(
+    cmd: List[str],
+    ws: str,
+    to_line: Callable[[bytes], Optional[str]],
+) -> Tuple[List[str], Optional[str]]:
+    """
+    Run a grep backend and collect its matches as they stream in, killing
+    the child as soon as the result or byte cap is hit, so the worst case is
+    bounded by the caps rather than the size of the tree.
+    to_line maps one raw output line to a match string (None to skip it).
+
+    Returns (matches, error). error is the backend's stderr when it exits
+    with status 2 (bad pattern, unreadable target) without matching
+    anything; status 1 (no match) is not an error. Raises
+    subprocess.TimeoutExpired on timeout.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        cwd=ws,
+        bufsize=_PIPE_READ_CHUNK,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    err: List[bytes] = []
+    err_reader = threading.Thread(
+        target=_drain_tail, args=(proc.stderr, _MAX_GREP_STDERR_BYTES, err), daemon=True
+    )
+    err_reader.start()
+    timed_out = threading.Event()
+
+    def _kill() -> None:
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(_GREP_TIMEOUT_S, _kill)
+    timer.start()
+    lines: List[str] = []
+    nbytes = 0
+    eof = False
+    try:
+        assert proc.stdout is not None
+        for raw in proc.stdout:
+            line = to_line(raw)
+            if line is None:
+                continue
+            nbytes += len(line) + 1
+            if nbytes > _MAX_GREP_OUTPUT_BYTES:
+                break
+            lines.append(line)
+            if len(lines) >= _MAX_GREP_RESULTS:
+                break
+        else:
+            eof = True
+    finally:
+        timer.cancel()
+        # At EOF the child is exiting on its own; killing it then would
+        # clobber its exit status.
+        if not eof and proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        rc = proc.wait()
+        err_reader.join(_KILL_DRAIN_GRACE_S)
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, _GREP_TIMEOUT_S)
+    if rc == 2 and not lines:
+        msg = b"".join(err).decode("utf-8", errors="replace").strip()
+        return lines, msg or f"{os.path.basename(cmd[0])} exited with status 2"
+    return lines, None
+
+
+def _rg_json_line(raw: bytes) -> Optional[str]:
+    try:
+        rec = json.loads(raw)
+        if rec.get("type") != "match":
+            return None
+        data = rec["data"]
+        text = _rg_text(data["lines"]).rstrip("\r\n")
+        return f"{_rg_text(data['path'])}:{data['line_number']}:{text}"
+    except (ValueError, KeyError, TypeError, AttributeError):
+        # Truncated or unexpected record: skip it like any non-match line
+        return None
+
+
+def _grep_line(raw: bytes) -> Optional[str]:
+    return raw.rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+
+def _grep_rg(
+    rg: str, ws: str, pattern: str, target: str, fixed_string: bool
+) -> Tuple[List[str], Optional[str]]:
+    """
+    ripgrep backend: parses --json match records. Returns (matches, error).
+
+    --no-ignore/--hidden keep the file set identical to the GNU grep path;
+    --sort=path keeps results deterministic (rg otherwise walks in parallel).
+    """
+    mode = ("-F",) if fixed_string else ()
+    cmd = [rg, *_RG_FILTER_ARGS, *mode, "-e", pattern, "--", target]
+    return _stream_grep_lines(cmd, ws, _rg_json_line)
+
+
+def _grep_gnu(
+    ws: str, pattern: str, target: str, fixed_string: bool
+) -> Tuple[List[str], Optional[str]]:
+    """GNU grep fallback, with the same early termination as rg. Returns (matches, error)."""
+    # Fixed-string vs regex mode
+    mode = "-F" if fixed_string else "-E"
+    cmd = ["grep", "-rn", mode, *_GNU_GREP_FILTER_ARGS, "-e", pattern, "--", target]
+    return _stream_grep_lines(cmd, ws, _grep_line)
+
+
 def _grep(
-    workspace: str,
+    ws: str,
     pattern: str,
     path: str = ".",
     fixed_string: bool = False,
@@ -227,8 +623,11 @@ def _grep(
     """
     Safe grep with caps and directory exclusions.
 
+    Uses ripgrep when available, GNU grep otherwise (or when rg rejects
+    the pattern). Matches are "path:line:text" strings either way.
+
     Args:
-        workspace: Workspace path
+        ws: Realpath-resolved workspace
         pattern: Search pattern
         path: Relative path to search in (default ".")
         fixed_string: If True, use fixed-string matching (-F) instead of regex (-E)
@@ -236,61 +635,22 @@ def _grep(
     Returns:
         Dict with ok, pattern, path, matches, count, truncated
     """
-    ws = os.path.realpath(workspace)
     target = os.path.join(ws, path) if path != "." else ws
 
-    # Build command
-    cmd = ["grep", "-rn"]
-
-    # Fixed-string vs regex mode
-    if fixed_string:
-        cmd.append("-F")
-    else:
-        cmd.append("-E")
-
-    # File type includes (code + config + docs)
-    includes = [
-        "*.py", "*.txt", "*.md", "*.rst",
-        "*.json", "*.yaml", "*.yml", "*.toml",
-        "*.js", "*.ts", "*.jsx", "*.tsx",
-        "*.java", "*.go", "*.rs", "*.c", "*.h", "*.cpp",
-        "*.html", "*.css", "*.sh",
-    ]
-    for inc in includes:
-        cmd.append(f"--include={inc}")
-
-    # Directory excluses (noise + security)
-    excludes = [
-        ".git", "__pycache__", "node_modules",
-        ".venv", "venv", ".env",
-        "dist", "build", ".next", ".cache",
-        "coverage", "htmlcov", ".pytest_cache",
-        ".mypy_cache", ".ruff_cache",
-    ]
-    for exc in excludes:
-        cmd.append(f"--exclude-dir={exc}")
-
-    cmd.append(pattern)
-    cmd.append(target)
-
     try:
-        proc = subprocess.run(
-            cmd,
-            cwd=ws,
-            capture_output=True,
-            timeout=30,
-        )
+        if _RG_BIN:
+            lines, error = _grep_rg(_RG_BIN, ws, pattern, target, fixed_string)
+            if error is not None:
+                # rg's Rust regex syntax rejects some valid EREs ((a)\1,
+                # \<word\>); re-run through GNU grep so what a pattern
+                # matches does not depend on whether rg is installed.
+                lines, error = _grep_gnu(ws, pattern, target, fixed_string)
+        else:
+            lines, error = _grep_gnu(ws, pattern, target, fixed_string)
     except subprocess.TimeoutExpired:
         return {"ok": False, "error": "grep timeout", "matches": []}
-
-    raw = proc.stdout.decode("utf-8", errors="replace")
-    # Cap output
-    if len(raw) > _MAX_GREP_OUTPUT_BYTES:
-        raw = raw[:_MAX_GREP_OUTPUT_BYTES] + "\n[truncated]"
-
-    # Parse lines and cap results
-    lines = raw.strip().split("\n") if raw.strip() else []
-    lines = lines[:_MAX_GREP_RESULTS]
+    if error is not None:
+        return {"ok": False, "error": f"grep failed: {error}", "matches": []}
 
     return {
         "ok": True,
@@ -303,36 +663,34 @@ def _grep(
     }
 
 
-def _list_dir(workspace: str, path: str = ".") -> Dict[str, Any]:
+def _list_dir(ws: str, path: str = ".") -> Dict[str, Any]:
     """
     Safe directory listing with caps.
     No recursive, max entries capped.
     """
-    ws = os.path.realpath(workspace)
     target = os.path.join(ws, path) if path != "." else ws
     
     if not os.path.isdir(target):
         return {"ok": False, "error": f"not a directory: {path}", "entries": []}
     
+    # One readdir pass; DirEntry caches d_type so regular entries need no extra
+    # stat. Symlinks are still followed, matching the old isdir/isfile semantics.
     try:
-        entries = os.listdir(target)
+        with os.scandir(target) as it:
+            entries = sorted(it, key=lambda e: e.name)[:_MAX_LIST_DIR_ENTRIES]
     except OSError as e:
         return {"ok": False, "error": str(e), "entries": []}
     
-    # Cap entries
-    entries = sorted(entries)[:_MAX_LIST_DIR_ENTRIES]
-    
     # Add type info
     result = []
-    for name in entries:
-        full = os.path.join(target, name)
-        entry: Dict[str, Any] = {"name": name}
+    for de in entries:
+        entry: Dict[str, Any] = {"name": de.name}
         try:
-            if os.path.isdir(full):
+            if de.is_dir():
                 entry["type"] = "dir"
-            elif os.path.isfile(full):
+            elif de.is_file():
                 entry["type"] = "file"
-                entry["size"] = int(os.path.getsize(full))
+                entry["size"] = int(de.stat().st_size)
             else:
                 entry["type"] = "other"
         except OSError:
@@ -349,7 +707,7 @@ def _list_dir(workspace: str, path: str = ".") -> Dict[str, Any]:
 
 
 def _git_diff(
-    workspace: str,
+    ws: str,
     paths: Optional[List[str]] = None,
     context_lines: int = 3,
 ) -> Dict[str, Any]:
@@ -357,20 +715,19 @@ def _git_diff(
     Safe git diff with output cap and bounded context.
     
     Args:
-        workspace: Path to git repo
+        ws: Realpath-resolved git repo
         paths: Optional list of paths to restrict diff to
         context_lines: Number of context lines (0-10, default 3, use 1 for minimal)
     
     Returns current uncommitted changes.
     """
-    ws = os.path.realpath(workspace)
     paths = paths or []
     
     if not os.path.isdir(os.path.join(ws, ".git")):
         return {"ok": False, "error": "not a git repo", "diff": ""}
     
     # Build git diff command with bounded context
-    cmd = ["git", "diff", f"-U{context_lines}"]
+    cmd = ["git", "--no-optional-locks", "diff", f"-U{context_lines}"]
     
     # Add paths if specified (already validated by gate)
     if paths:
@@ -381,6 +738,7 @@ def _git_diff(
         proc = subprocess.run(
             cmd,
             cwd=ws,
+            env={**os.environ, **_GIT_NO_LOCKS_ENV},
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             timeout=30,
@@ -406,6 +764,120 @@ def _git_diff(
     }
 
 
+# Batched READ_FILEs are overlapped by the thread pool rather than served
+# from `git cat-file --batch`: blobs reflect HEAD, not the working tree the
+# agent has been editing.
+_PARALLEL_SAFE_ACTIONS = frozenset({"READ_FILE", "GREP", "LIST_DIR", "GIT_DIFF"})
+_MAX_PARALLEL_ACTIONS = 8
+
+
+def _do_read_file(ws: str, a: Action) -> ExecResult:
+    rel = a.payload["path"]
+    if not _is_confined_relative(rel):
+        raise RuntimeError(f"READ_FILE path not confined: {rel}")
+    ap = _resolve_in_workspace(ws, rel)
+    if ap is None:
+        raise RuntimeError(f"READ_FILE escapes via symlink: {rel}")
+    text = _read_file(ap)
+    return ExecResult(True, a, {"path": rel, "text": text})
+
+
+def _do_write_file(ws: str, a: Action) -> ExecResult:
+    rel = a.payload["path"]
+    text = a.payload["text"]
+    if not _is_confined_relative(rel):
+        raise RuntimeError(f"WRITE_FILE path not confined: {rel}")
+    ap = _resolve_parent_in_workspace(ws, rel)
+    if ap is None:
+        raise RuntimeError(f"WRITE_FILE escapes via symlink: {rel}")
+    try:
+        nbytes = _write_file(ap, text)
+    except OSError as e:
+        if e.errno != errno.ELOOP:
+            raise
+        # Final component is a symlink: resolve it fully and re-check
+        ap = _resolve_in_workspace(ws, rel)
+        if ap is None:
+            raise RuntimeError(f"WRITE_FILE escapes via symlink: {rel}") from e
+        nbytes = _write_file(ap, text)
+    return ExecResult(True, a, {"path": rel, "bytes": nbytes})
+
+
+def _do_apply_patch(ws: str, a: Action) -> ExecResult:
+    out = _apply_patch_minimal(ws, a.payload["patch"])
+    return ExecResult(bool(out.get("applied")), a, out)
+
+
+def _do_run_tests(ws: str, a: Action) -> ExecResult:
+    mode = _get_test_mode(a.payload)
+    out = _run_tests(ws, a.payload["argv"], mode=mode)
+    return ExecResult(bool(out.get("ok")), a, out)
+
+
+def _do_grep(ws: str, a: Action) -> ExecResult:
+    pattern = a.payload["pattern"]
+    path = a.payload.get("path", ".")
+    fixed_string = bool(a.payload.get("fixed_string", False))
+    # Defense in depth: validate path again
+    if path != ".":
+        if not _is_confined_relative(path):
+            raise RuntimeError(f"GREP path not confined: {path}")
+        if not _realpath_in_workspace(ws, path):
+            raise RuntimeError(f"GREP path escapes via symlink: {path}")
+    out = _grep(ws, pattern, path, fixed_string=fixed_string)
+    return ExecResult(bool(out.get("ok")), a, out)
+
+
+def _do_list_dir(ws: str, a: Action) -> ExecResult:
+    path = a.payload.get("path", ".")
+    if path != ".":
+        if not _is_confined_relative(path):
+            raise RuntimeError(f"LIST_DIR path not confined: {path}")
+        if not _realpath_in_workspace(ws, path):
+            raise RuntimeError(f"LIST_DIR path escapes via symlink: {path}")
+    out = _list_dir(ws, path)
+    return ExecResult(bool(out.get("ok")), a, out)
+
+
+def _do_git_diff(ws: str, a: Action) -> ExecResult:
+    paths = a.payload.get("paths", [])
+    context_lines = a.payload.get("context_lines", 3)
+    out = _git_diff(ws, paths=paths, context_lines=context_lines)
+    return ExecResult(bool(out.get("ok")), a, out)
+
+
+# Action type -> handler(ws, action). Each handler re-checks confinement
+# itself (defense in depth) before touching the filesystem.
+_HANDLERS: Dict[str, Callable[[str, Action], ExecResult]] = {
+    "READ_FILE": _do_read_file,
+    "WRITE_FILE": _do_write_file,
+    "APPLY_PATCH": _do_apply_patch,
+    "RUN_TESTS": _do_run_tests,
+    "GREP": _do_grep,
+    "LIST_DIR": _do_list_dir,
+    "GIT_DIFF": _do_git_diff,
+}
+
+
+def _execute_action(ws: str, a: Action) -> ExecResult:
+    """Execute one approved action via its _HANDLERS entry."""
+    handler = _HANDLERS.get(a.type)
+    if handler is None:
+        return ExecResult(False, a, {"error": "unknown action type"})
+    return handler(ws, a)
+
+
+def _execute_batch(ws: str, batch: List[Action]) -> List[ExecResult]:
+    """
+    Execute consecutive read-only actions concurrently.
+    Results keep proposal order; the first failing action (in order) re-raises.
+    """
+    if len(batch) <= 1:
+        return [_execute_action(ws, a) for a in batch]
+    with ThreadPoolExecutor(max_workers=min(_MAX_PARALLEL_ACTIONS, len(batch))) as pool:
+        return list(pool.map(lambda a: _execute_action(ws, a), batch))
+
+
 def execute_decision(state: StateSnapshot, decision: Decision) -> Tuple[ExecResult, ...]:
     # CRITICAL: Verify decision was created by gate (prevents forged decisions)
     if not verify_decision_sig(decision):
@@ -417,67 +889,16 @@ def execute_decision(state: StateSnapshot, decision: Decision) -> Tuple[ExecResu
     ws = os.path.realpath(state.workspace)
     results: List[ExecResult] = []
 
+    # Read-only actions between two side-effecting ones (WRITE_FILE, APPLY_PATCH,
+    # RUN_TESTS) are independent and run concurrently; side effects act as barriers.
+    batch: List[Action] = []
     for a in decision.approved_actions:
-        if a.type == "READ_FILE":
-            rel = a.payload["path"]
-            if not _is_confined_relative(rel):
-                raise RuntimeError(f"READ_FILE path not confined: {rel}")
-            if not _realpath_in_workspace(ws, rel):
-                raise RuntimeError(f"READ_FILE escapes via symlink: {rel}")
-            ap = os.path.join(ws, rel)
-            text = _read_file(ap)
-            results.append(ExecResult(True, a, {"path": rel, "text": text}))
-
-        elif a.type == "WRITE_FILE":
-            rel = a.payload["path"]
-            text = a.payload["text"]
-            if not _is_confined_relative(rel):
-                raise RuntimeError(f"WRITE_FILE path not confined: {rel}")
-            if not _realpath_in_workspace(ws, rel):
-                raise RuntimeError(f"WRITE_FILE escapes via symlink: {rel}")
-            ap = os.path.join(ws, rel)
-            nbytes = _write_file(ap, text)
-            results.append(ExecResult(True, a, {"path": rel, "bytes": nbytes}))
-
-        elif a.type == "APPLY_PATCH":
-            out = _apply_patch_minimal(ws, a.payload["patch"])
-            results.append(ExecResult(bool(out.get("applied")), a, out))
-
-        elif a.type == "RUN_TESTS":
-            mode = _get_test_mode(a.payload)
-            out = _run_tests(ws, a.payload["argv"], mode=mode)
-            results.append(ExecResult(bool(out.get("ok")), a, out))
-
-        elif a.type == "GREP":
-            pattern = a.payload["pattern"]
-            path = a.payload.get("path", ".")
-            fixed_string = bool(a.payload.get("fixed_string", False))
-            # Defense in depth: validate path again
-            if path != ".":
-                if not _is_confined_relative(path):
-                    raise RuntimeError(f"GREP path not confined: {path}")
-                if not _realpath_in_workspace(ws, path):
-                    raise RuntimeError(f"GREP path escapes via symlink: {path}")
-            out = _grep(ws, pattern, path, fixed_string=fixed_string)
-            results.append(ExecResult(bool(out.get("ok")), a, out))
-
-        elif a.type == "LIST_DIR":
-            path = a.payload.get("path", ".")
-            if path != ".":
-                if not _is_confined_relative(path):
-                    raise RuntimeError(f"LIST_DIR path not confined: {path}")
-                if not _realpath_in_workspace(ws, path):
-                    raise RuntimeError(f"LIST_DIR path escapes via symlink: {path}")
-            out = _list_dir(ws, path)
-            results.append(ExecResult(bool(out.get("ok")), a, out))
-
-        elif a.type == "GIT_DIFF":
-            paths = a.payload.get("paths", [])
-            context_lines = a.payload.get("context_lines", 3)
-            out = _git_diff(ws, paths=paths, context_lines=context_lines)
-            results.append(ExecResult(bool(out.get("ok")), a, out))
-
-        else:
-            results.append(ExecResult(False, a, {"error": "unknown action type"}))
+        if a.type in _PARALLEL_SAFE_ACTIONS:
+            batch.append(a)
+            continue
+        results.extend(_execute_batch(ws, batch))
+        batch = []
+        results.append(_execute_action(ws, a))
+    results.extend(_execute_batch(ws, batch))
 
     return tuple(results)
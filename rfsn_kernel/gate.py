@@ -9,22 +9,32 @@ Security hardening:
 """
 from __future__ import annotations
 
+import functools
+import itertools
 import os
 import re
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .types import StateSnapshot, Proposal, Action, Decision, _compute_decision_sig
 from .patch_safety import patch_paths_are_confined
 
 
 # HARD BOUNDARY: allowlist test argv (deterministic, non-interactive)
-_ALLOWED_TEST_PREFIXES: List[List[str]] = [
-    ["python", "-m", "pytest", "-q"],
-    ["pytest", "-q"],
-]
-
-# Safe pytest nodeid pattern: path/to/file.py::ClassName::test_name
-_PYTEST_NODEID_SAFE = re.compile(r"^[A-Za-z0-9_./:-]+(::[A-Za-z0-9_./:-]+)*$")
+_ALLOWED_TEST_PREFIXES: Tuple[Tuple[str, ...], ...] = (
+    ("python", "-m", "pytest", "-q"),
+    ("pytest", "-q"),
+)
+
+# Whole-argv form of the allowlist, matched against the NUL-joined argv:
+# an allowed prefix followed by safe pytest nodeids
+# (path/to/file.py::ClassName::test_name), none starting with "-" (flags).
+# ":" is in the class, so "::" separators need no nested group; a single
+# class run with fullmatch cannot backtrack and, unlike "$", rejects a
+# trailing newline. Group 1 captures the nodeid suffix.
+_ALLOWED_TEST_ARGV_RE = re.compile(
+    "(?:%s)((?:\x00[A-Za-z0-9_./:][A-Za-z0-9_./:-]*)*)"
+    % "|".join(re.escape("\x00".join(p)) for p in _ALLOWED_TEST_PREFIXES)
+)
 
 # Hard caps to prevent resource abuse
 _MAX_WRITE_BYTES = 512_000          # 512 KB per WRITE_FILE
@@ -32,61 +42,66 @@ _MAX_TOTAL_WRITE_BYTES = 2_000_000  # 2 MB per proposal
 _MAX_GREP_RESULTS = 100             # max lines returned by GREP
 _MAX_LIST_DIR_ENTRIES = 500         # max entries returned by LIST_DIR
 _MAX_GIT_DIFF_BYTES = 512_000       # 512 KB for GIT_DIFF output
+_MAX_PATCH_BYTES = 512_000          # 512 KB per APPLY_PATCH
+_MAX_PATCH_FILES = 50               # files touched per APPLY_PATCH
 
 # GREP policy: prevent regex DoS
 _MAX_GREP_PATTERN_LEN = 300
-_SUSPICIOUS_REGEX = re.compile(r"(\(\.\+\)\+)|(\(\.\*\)\+)|(\.\+\+)|(\.\*\+)|(\+\+)")
+# Literal constructs rejected as catastrophic-backtracking risks: (.+)+,
+# (.*)+, .++, .*+ and ++ (".++" is subsumed by "++"). Plain substring
+# tests run in C with no regex engine involved.
+_SUSPICIOUS_SUBSTRINGS = ("++", ".*+", "(.+)+", "(.*)+")
 
 
-def _realpath_in_workspace(workspace: str, user_path: str) -> bool:
+def _utf8_len(text: str) -> int:
     """
-    Realpath-based confinement check.
-    Prevents escaping via symlinks inside workspace.
+    UTF-8 byte length; ASCII text (the common case) needs no encode copy.
+    Raises UnicodeEncodeError for unpaired surrogates.
+    """
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-8"))
+
+
+def _in_resolved_workspace(ws: str, user_path: str) -> bool:
+    """
+    Realpath confinement check against an already-resolved workspace root
+    (gate() resolves it once per proposal, not once per checked path).
     """
-    ws = os.path.realpath(workspace)
     target = os.path.realpath(os.path.join(ws, user_path))
-    try:
-        return os.path.commonpath([ws, target]) == ws
-    except ValueError:
-        return False
+    # Both sides are realpaths, so a separator-terminated prefix compare is
+    # equivalent to commonpath without splitting either path into components.
+    return target == ws or target.startswith(ws if ws.endswith(os.sep) else ws + os.sep)
 
 
-def _is_confined_relative(p: str) -> bool:
+def _realpath_in_workspace(workspace: str, *user_paths: str) -> bool:
     """
-    Check that path is relative and has no traversal.
+    Realpath-based confinement check of every user path.
+    Prevents escaping via symlinks inside workspace; the workspace itself
+    is resolved once for all paths.
     """
-    p = p.strip().replace("\\", "/")
-    if not p:
-        return False
-    if p.startswith("/") or p.startswith("~"):
-        return False
-    if ":" in p.split("/")[0]:  # windows drive
-        return False
-    # Reject traversal
-    segs = [s for s in p.split("/") if s not in ("", ".")]
-    if any(s == ".." for s in segs):
-        return False
-    return True
+    ws = os.path.realpath(workspace)
+    return all(_in_resolved_workspace(ws, p) for p in user_paths)
+
 
+_BACKSLASH_TO_SLASH = str.maketrans("\\", "/")
 
-def _validate_nodeid_path(workspace: str, nodeid: str) -> bool:
+
+def _is_confined_relative(p: str) -> bool:
     """
-    Validate pytest nodeid:
-    - Must match safe pattern
-    - File segment (before ::) must be confined relative path
-    - File segment must resolve inside workspace (realpath)
+    Check that path is relative and has no traversal.
     """
-    if not _PYTEST_NODEID_SAFE.match(nodeid):
+    p = p.strip().translate(_BACKSLASH_TO_SLASH)
+    if not p or p[0] in "/~":
         return False
-    
-    # Extract file path segment (before first ::)
-    file_part = nodeid.split("::", 1)[0].replace("\\", "/").strip()
-    
-    if not _is_confined_relative(file_part):
-        return False
-    
-    # Realpath check
-    return _realpath_in_workspace(workspace, file_part)
+    # Windows drive: ":" anywhere in the first segment
+    colon = p.find(":")
+    if colon != -1:
+        slash = p.find("/")
+        if slash == -1 or colon < slash:
+            return False
+    # Reject traversal: a ".." segment at the start, middle or end
+    return not (p == ".." or p.startswith("../") or p.endswith("/..") or "/../" in p)
 
 
 def _validate_grep_pattern(pattern: str) -> Tuple[bool, str]:
@@ -102,11 +117,38 @@ def _validate_grep_pattern(pattern: str) -> Tuple[bool, str]:
         return False, "empty grep pattern"
     if len(pat) > _MAX_GREP_PATTERN_LEN:
         return False, f"grep pattern too long ({len(pat)} > {_MAX_GREP_PATTERN_LEN})"
-    if _SUSPICIOUS_REGEX.search(pat):
+    if any(needle in pat for needle in _SUSPICIOUS_SUBSTRINGS):
         return False, "grep pattern contains suspicious regex construct"
     return True, "ok"
 
 
+@functools.lru_cache(maxsize=256)
+def _tests_argv_nodeid_files(argv: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """
+    Syntactic (workspace-independent) part of the allowlist check, memoized
+    because agent loops re-submit the same argv. Returns the nodeid file
+    segments that still need a realpath check, or None if argv is rejected.
+
+    Realpath checks are never cached: symlinks in the workspace can change
+    between calls.
+    """
+    norm = [s for s in (x.strip() for x in argv) if s]
+    joined = "\x00".join(norm)
+    # A NUL inside a token would forge a separator
+    if joined.count("\x00") != len(norm) - 1:
+        return None
+    m = _ALLOWED_TEST_ARGV_RE.fullmatch(joined)
+    if m is None:
+        return None
+    files = []
+    for nodeid in m.group(1).split("\x00")[1:]:
+        file_part = nodeid.split("::", 1)[0]
+        if not _is_confined_relative(file_part):
+            return None
+        files.append(file_part)
+    return tuple(files)
+
+
 def is_allowed_tests_argv(argv: List[str], *, workspace: str) -> bool:
     """
     Check if test argv matches allowlist.
@@ -116,21 +158,167 @@ def is_allowed_tests_argv(argv: List[str], *, workspace: str) -> bool:
     - ["python", "-m", "pytest", "-q"]
     - ["pytest", "-q", "tests/foo.py::TestClass::test_bar"]  # safe nodeids
     """
-    norm = [str(x).strip() for x in argv if str(x).strip() != ""]
-    for prefix in _ALLOWED_TEST_PREFIXES:
-        if norm[: len(prefix)] == prefix:
-            # Exact match (no suffix)
-            if len(norm) == len(prefix):
-                return True
-            # Check suffix: only safe nodeids allowed (no flags)
-            suffix = norm[len(prefix):]
-            # Reject anything starting with - (flags)
-            if any(s.startswith("-") for s in suffix):
-                return False
-            # All suffix items must be validated nodeids
-            if all(_validate_nodeid_path(workspace, s) for s in suffix):
-                return True
-    return False
+    files = _tests_argv_nodeid_files(tuple(str(x) for x in argv))
+    if files is None:
+        return False
+    if not files:
+        return True
+    return _realpath_in_workspace(workspace, *files)
+
+
+# Per-type validators. Each returns a deny reason, or None to approve.
+# ctx carries per-proposal state: running totals (cumulative write bytes)
+# and realpath verdicts, so a path named by several actions (READ_FILE then
+# WRITE_FILE) is resolved once. The verdict cache lives for one gate() call
+# only; the controller re-resolves every path at execution time.
+
+
+def _confined_in(ws: str, rel: str, ctx: Dict[str, Any]) -> bool:
+    cache: Dict[str, bool] = ctx["confined"]
+    ok = cache.get(rel)
+    if ok is None:
+        ok = cache[rel] = _in_resolved_workspace(ws, rel)
+    return ok
+
+
+def _check_read_file(ws: str, a: Action, ctx: Dict[str, Any]) -> Optional[str]:
+    rel = a.payload.get("path")
+    if not isinstance(rel, str) or not rel:
+        return "READ_FILE missing path"
+    if not _is_confined_relative(rel):
+        return f"READ_FILE path not confined: {rel}"
+    if not _confined_in(ws, rel, ctx):
+        return f"READ_FILE escapes via symlink: {rel}"
+    return None
+
+
+def _check_write_file(ws: str, a: Action, ctx: Dict[str, Any]) -> Optional[str]:
+    rel = a.payload.get("path")
+    text = a.payload.get("text")
+    if not isinstance(rel, str) or not rel:
+        return "WRITE_FILE missing path"
+    if not isinstance(text, str):
+        return "WRITE_FILE missing text"
+    if not _is_confined_relative(rel):
+        return f"WRITE_FILE path not confined: {rel}"
+    if not _confined_in(ws, rel, ctx):
+        return f"WRITE_FILE escapes via symlink: {rel}"
+    
+    # Enforce write caps
+    try:
+        nbytes = _utf8_len(text)
+    except UnicodeEncodeError:
+        return f"WRITE_FILE text is not valid UTF-8: {rel}"
+    if nbytes > _MAX_WRITE_BYTES:
+        return f"WRITE_FILE exceeds per-file cap: {nbytes} > {_MAX_WRITE_BYTES}"
+    ctx["total_write_bytes"] += nbytes
+    if ctx["total_write_bytes"] > _MAX_TOTAL_WRITE_BYTES:
+        return f"WRITE_FILE exceeds proposal cap: {ctx['total_write_bytes']} > {_MAX_TOTAL_WRITE_BYTES}"
+    return None
+
+
+def _check_apply_patch(ws: str, a: Action, ctx: Dict[str, Any]) -> Optional[str]:
+    patch = a.payload.get("patch")
+    if not isinstance(patch, str) or not patch.strip():
+        return "APPLY_PATCH missing patch"
+    # Size cap before parsing, so an oversized patch costs no scan at all
+    try:
+        nbytes = _utf8_len(patch)
+    except UnicodeEncodeError:
+        return "APPLY_PATCH patch is not valid UTF-8"
+    if nbytes > _MAX_PATCH_BYTES:
+        return f"APPLY_PATCH exceeds size cap: {nbytes} > {_MAX_PATCH_BYTES}"
+    # Hard requirement: patch paths must be parseable and confined
+    ok, reason, _files = patch_paths_are_confined(ws, patch, max_files=_MAX_PATCH_FILES)
+    if not ok:
+        return f"APPLY_PATCH rejected: {reason}"
+    return None
+
+
+def _check_run_tests(ws: str, a: Action, ctx: Dict[str, Any]) -> Optional[str]:
+    argv = a.payload.get("argv")
+    # map/repeat keeps the per-element isinstance in C (no generator frame)
+    if not isinstance(argv, list) or not all(map(isinstance, argv, itertools.repeat(str))):
+        return "RUN_TESTS argv must be list[str]"
+    if not is_allowed_tests_argv(argv, workspace=ws):
+        return f"RUN_TESTS argv not allowlisted: {argv}"
+    # Optional execution mode: host|docker (controller decides implementation)
+    mode = a.payload.get("mode")
+    if mode is not None:
+        if not isinstance(mode, str):
+            return "RUN_TESTS mode must be string"
+        m = mode.strip().lower()
+        if m not in ("host", "docker"):
+            return f"RUN_TESTS mode invalid: {m}"
+    return None
+
+
+def _check_grep(ws: str, a: Action, ctx: Dict[str, Any]) -> Optional[str]:
+    pattern = a.payload.get("pattern")
+    path = a.payload.get("path", ".")
+    if not isinstance(pattern, str):
+        return "GREP pattern must be string"
+    # Validate pattern (length + regex DoS)
+    ok, why = _validate_grep_pattern(pattern)
+    if not ok:
+        return f"GREP rejected: {why}"
+    if not isinstance(path, str):
+        return "GREP path must be string"
+    # Validate path if specified
+    if path != ".":
+        if not _is_confined_relative(path):
+            return f"GREP path not confined: {path}"
+        if not _confined_in(ws, path, ctx):
+            return f"GREP path escapes via symlink: {path}"
+    # Optional fixed_string mode (default: regex mode)
+    fixed_string = a.payload.get("fixed_string")
+    if fixed_string is not None and not isinstance(fixed_string, bool):
+        return "GREP fixed_string must be bool"
+    return None
+
+
+def _check_list_dir(ws: str, a: Action, ctx: Dict[str, Any]) -> Optional[str]:
+    path = a.payload.get("path", ".")
+    if not isinstance(path, str):
+        return "LIST_DIR path must be string"
+    if path != ".":
+        if not _is_confined_relative(path):
+            return f"LIST_DIR path not confined: {path}"
+        if not _confined_in(ws, path, ctx):
+            return f"LIST_DIR path escapes via symlink: {path}"
+    return None
+
+
+def _check_git_diff(ws: str, a: Action, ctx: Dict[str, Any]) -> Optional[str]:
+    # Optional: paths (list of relative paths), context_lines (0-10)
+    paths = a.payload.get("paths", [])
+    context_lines = a.payload.get("context_lines", 3)  # Default: 3 lines context
+    
+    # Validate paths if provided
+    if paths:
+        if not isinstance(paths, list) or len(paths) > 20:
+            return "GIT_DIFF paths must be list of max 20 paths"
+        for path in paths:
+            if not isinstance(path, str) or not path:
+                return "GIT_DIFF paths must be non-empty strings"
+            if not _is_confined_relative(path):
+                return f"GIT_DIFF path not confined: {path}"
+    
+    # Validate context lines
+    if not isinstance(context_lines, int) or context_lines < 0 or context_lines > 10:
+        return "GIT_DIFF context_lines must be 0-10"
+    return None
+
+
+_VALIDATORS: Dict[str, Callable[[str, Action, Dict[str, Any]], Optional[str]]] = {
+    "READ_FILE": _check_read_file,
+    "WRITE_FILE": _check_write_file,
+    "APPLY_PATCH": _check_apply_patch,
+    "RUN_TESTS": _check_run_tests,
+    "GREP": _check_grep,
+    "LIST_DIR": _check_list_dir,
+    "GIT_DIFF": _check_git_diff,
+}
 
 
 def gate(state: StateSnapshot, proposal: Proposal) -> Decision:
@@ -140,124 +328,16 @@ def gate(state: StateSnapshot, proposal: Proposal) -> Decision:
         return _make_decision(False, f"workspace does not exist: {ws}", ())
 
     approved: List[Action] = []
-    total_write_bytes = 0
+    ctx: Dict[str, Any] = {"total_write_bytes": 0, "confined": {}}
 
     for a in proposal.actions:
-        if a.type == "READ_FILE":
-            rel = a.payload.get("path")
-            if not isinstance(rel, str) or not rel:
-                return _make_decision(False, "READ_FILE missing path", ())
-            if not _is_confined_relative(rel):
-                return _make_decision(False, f"READ_FILE path not confined: {rel}", ())
-            if not _realpath_in_workspace(ws, rel):
-                return _make_decision(False, f"READ_FILE escapes via symlink: {rel}", ())
-            approved.append(a)
-
-        elif a.type == "WRITE_FILE":
-            rel = a.payload.get("path")
-            text = a.payload.get("text")
-            if not isinstance(rel, str) or not rel:
-                return _make_decision(False, "WRITE_FILE missing path", ())
-            if not isinstance(text, str):
-                return _make_decision(False, "WRITE_FILE missing text", ())
-            if not _is_confined_relative(rel):
-                return _make_decision(False, f"WRITE_FILE path not confined: {rel}", ())
-            if not _realpath_in_workspace(ws, rel):
-                return _make_decision(False, f"WRITE_FILE escapes via symlink: {rel}", ())
-            
-            # Enforce write caps
-            nbytes = len(text.encode("utf-8", errors="replace"))
-            if nbytes > _MAX_WRITE_BYTES:
-                return _make_decision(False, f"WRITE_FILE exceeds per-file cap: {nbytes} > {_MAX_WRITE_BYTES}", ())
-            total_write_bytes += nbytes
-            if total_write_bytes > _MAX_TOTAL_WRITE_BYTES:
-                return _make_decision(False, f"WRITE_FILE exceeds proposal cap: {total_write_bytes} > {_MAX_TOTAL_WRITE_BYTES}", ())
-            
-            approved.append(a)
-
-        elif a.type == "APPLY_PATCH":
-            patch = a.payload.get("patch")
-            if not isinstance(patch, str) or not patch.strip():
-                return _make_decision(False, "APPLY_PATCH missing patch", ())
-            # Hard requirement: patch paths must be parseable and confined
-            ok, reason, _files = patch_paths_are_confined(ws, patch)
-            if not ok:
-                return _make_decision(False, f"APPLY_PATCH rejected: {reason}", ())
-            approved.append(a)
-
-        elif a.type == "RUN_TESTS":
-            argv = a.payload.get("argv")
-            if not isinstance(argv, list) or not all(isinstance(x, str) for x in argv):
-                return _make_decision(False, "RUN_TESTS argv must be list[str]", ())
-            if not is_allowed_tests_argv(argv, workspace=ws):
-                return _make_decision(False, f"RUN_TESTS argv not allowlisted: {argv}", ())
-            # Optional execution mode: host|docker (controller decides implementation)
-            mode = a.payload.get("mode")
-            if mode is not None:
-                if not isinstance(mode, str):
-                    return _make_decision(False, "RUN_TESTS mode must be string", ())
-                m = mode.strip().lower()
-                if m not in ("host", "docker"):
-                    return _make_decision(False, f"RUN_TESTS mode invalid: {m}", ())
-            approved.append(a)
-
-        elif a.type == "GREP":
-            pattern = a.payload.get("pattern")
-            path = a.payload.get("path", ".")
-            if not isinstance(pattern, str):
-                return _make_decision(False, "GREP pattern must be string", ())
-            # Validate pattern (length + regex DoS)
-            ok, why = _validate_grep_pattern(pattern)
-            if not ok:
-                return _make_decision(False, f"GREP rejected: {why}", ())
-            if not isinstance(path, str):
-                return _make_decision(False, "GREP path must be string", ())
-            # Validate path if specified
-            if path != ".":
-                if not _is_confined_relative(path):
-                    return _make_decision(False, f"GREP path not confined: {path}", ())
-                if not _realpath_in_workspace(ws, path):
-                    return _make_decision(False, f"GREP path escapes via symlink: {path}", ())
-            # Optional fixed_string mode (default: regex mode)
-            fixed_string = a.payload.get("fixed_string")
-            if fixed_string is not None and not isinstance(fixed_string, bool):
-                return _make_decision(False, "GREP fixed_string must be bool", ())
-            approved.append(a)
-
-        elif a.type == "LIST_DIR":
-            path = a.payload.get("path", ".")
-            if not isinstance(path, str):
-                return _make_decision(False, "LIST_DIR path must be string", ())
-            if path != ".":
-                if not _is_confined_relative(path):
-                    return _make_decision(False, f"LIST_DIR path not confined: {path}", ())
-                if not _realpath_in_workspace(ws, path):
-                    return _make_decision(False, f"LIST_DIR path escapes via symlink: {path}", ())
-            approved.append(a)
-
-        elif a.type == "GIT_DIFF":
-            # Optional: paths (list of relative paths), context_lines (0-10)
-            paths = a.payload.get("paths", [])
-            context_lines = a.payload.get("context_lines", 3)  # Default: 3 lines context
-            
-            # Validate paths if provided
-            if paths:
-                if not isinstance(paths, list) or len(paths) > 20:
-                    return _make_decision(False, "GIT_DIFF paths must be list of max 20 paths", ())
-                for path in paths:
-                    if not isinstance(path, str) or not path:
-                        return _make_decision(False, "GIT_DIFF paths must be non-empty strings", ())
-                    if not _is_confined_relative(path):
-                        return _make_decision(False, f"GIT_DIFF path not confined: {path}", ())
-            
-            # Validate context lines
-            if not isinstance(context_lines, int) or context_lines < 0 or context_lines > 10:
-                return _make_decision(False, "GIT_DIFF context_lines must be 0-10", ())
-            
-            approved.append(a)
-
-        else:
+        check = _VALIDATORS.get(a.type)
+        if check is None:
             return _make_decision(False, f"unknown action type: {a.type}", ())
+        reason = check(ws, a, ctx)
+        if reason is not None:
+            return _make_decision(False, reason, ())
+        approved.append(a)
 
     return _make_decision(True, "OK", tuple(approved))
 
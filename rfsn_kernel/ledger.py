@@ -2,19 +2,84 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import hashlib
 import os
 import json
+import threading
 
-from .types import StateSnapshot, Proposal, Decision, ExecResult, canonical_json, sha256_hex, dataclass_to_dict
+from .types import StateSnapshot, Proposal, Decision, ExecResult, canonical_json, dataclass_to_dict
+
+
+_APPEND_OPEN_FLAGS = (
+    os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    | getattr(os, "O_CLOEXEC", 0)
+    | getattr(os, "O_BINARY", 0)
+)
+
+
+# Chain head (next idx, last entry_hash) of ledgers this process appended to,
+# keyed by path and validated against the file's stat identity, so repeated
+# appends skip re-reading the ledger. Any outside change to the file (other
+# writer, truncation, replacement) changes the key and forces a re-read.
+_HeadKey = Tuple[int, int, int, int, int]
+_HEAD_CACHE: Dict[str, Tuple[_HeadKey, int, str]] = {}
+_APPEND_LOCK = threading.Lock()
+
+
+def _head_key(st: os.stat_result) -> _HeadKey:
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+
+_TAIL_WINDOW = 64 * 1024
+
+
+def _read_last_line(f: Any) -> bytes:
+    """
+    Last line of a binary file without its terminator, read backwards in
+    growing windows so cost is bounded by the record size, not the file size.
+    """
+    end = f.seek(0, os.SEEK_END)
+    window = _TAIL_WINDOW
+    while True:
+        start = max(0, end - window)
+        f.seek(start)
+        tail = f.read(end - start)
+        if tail.endswith(b"\n"):
+            tail = tail[:-1]
+        nl = tail.rfind(b"\n")
+        if nl != -1:
+            return tail[nl + 1:]
+        if start == 0:
+            return tail
+        window *= 2
+
+
+def _scan_head(ledger_path: str) -> Tuple[int, str]:
+    """Return (next idx, prev_hash) by reading the ledger's last record."""
+    prev_hash = "0" * 64
+    idx = 0
+    with open(ledger_path, "rb") as f:
+        last_line = _read_last_line(f)
+    if last_line:
+        last = json.loads(last_line.decode("utf-8"))
+        prev_hash = str(last["entry_hash"])
+        idx = int(last["idx"]) + 1
+    return idx, prev_hash
 
 
 @dataclass(frozen=True)
 class LedgerEntry:
+    """
+    A record as appended. ``payload`` is read-only: it shares its dicts
+    with the live state, proposal, decision and results (and one Action's
+    payload may appear under several keys), so mutating it would silently
+    edit the objects the gate signed. Deep-copy it before modifying.
+    """
     idx: int
     prev_hash: str
     entry_hash: str
-    payload: Dict[str, Any]
+    payload: Mapping[str, Any]
 
 
 def _entry_payload(
@@ -24,15 +89,39 @@ def _entry_payload(
     results: Tuple[ExecResult, ...],
     meta: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
+    # Approved actions and results reference the proposal's Action objects;
+    # a shared memo converts each of them once.
+    memo: Dict[int, Any] = {}
     return {
-        "state": dataclass_to_dict(state),
-        "proposal": dataclass_to_dict(proposal),
-        "decision": dataclass_to_dict(decision),
-        "results": dataclass_to_dict(results),
+        "state": dataclass_to_dict(state, memo),
+        "proposal": dataclass_to_dict(proposal, memo),
+        "decision": dataclass_to_dict(decision, memo),
+        "results": dataclass_to_dict(results, memo),
         "meta": meta or {},
     }
 
 
+def _encode_record(idx: int, prev_hash: str, payload: Dict[str, Any]) -> Tuple[str, bytes]:
+    """Return (entry_hash, stored line bytes) for one ledger record."""
+    body = {"idx": idx, "prev_hash": prev_hash, "payload": payload}
+    # Encode once; the hash and the stored line share the same buffer.
+    canon = canonical_json(body).encode("utf-8")
+    entry_hash = hashlib.sha256(canon).hexdigest()
+    # With sorted keys "entry_hash" sorts first, so the stored record is
+    # exactly canonical_json(rec): splice the hash ahead of the body.
+    data = b"".join((
+        b'{"entry_hash":"', entry_hash.encode("ascii"), b'",',
+        memoryview(canon)[1:], b"\n",
+    ))
+    return entry_hash, data
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
 def append_ledger(
     ledger_path: str,
     *,
@@ -42,25 +131,143 @@ def append_ledger(
     results: Tuple[ExecResult, ...],
     meta: Optional[Dict[str, Any]] = None,
 ) -> LedgerEntry:
-    os.makedirs(os.path.dirname(os.path.abspath(ledger_path)), exist_ok=True)
+    abs_path = os.path.abspath(ledger_path)
+    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
 
-    prev_hash = "0" * 64
-    idx = 0
+    # One appender at a time per process, so the cached head cannot fork the chain
+    with _APPEND_LOCK:
+        prev_hash = "0" * 64
+        idx = 0
 
-    if os.path.exists(ledger_path):
-        with open(ledger_path, "rb") as f:
-            lines = f.read().splitlines()
-        if lines:
-            last = json.loads(lines[-1].decode("utf-8"))
-            prev_hash = str(last["entry_hash"])
-            idx = int(last["idx"]) + 1
+        try:
+            st = os.stat(abs_path)
+        except FileNotFoundError:
+            st = None
+        if st is not None:
+            cached = _HEAD_CACHE.get(abs_path)
+            if cached is not None and cached[0] == _head_key(st):
+                idx, prev_hash = cached[1], cached[2]
+            else:
+                idx, prev_hash = _scan_head(abs_path)
 
-    payload = _entry_payload(state, proposal, decision, results, meta)
-    body = {"idx": idx, "prev_hash": prev_hash, "payload": payload}
-    entry_hash = sha256_hex(canonical_json(body))
-    rec = {"idx": idx, "prev_hash": prev_hash, "entry_hash": entry_hash, "payload": payload}
+        payload = _entry_payload(state, proposal, decision, results, meta)
+        entry_hash, data = _encode_record(idx, prev_hash, payload)
 
-    with open(ledger_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        # One O_APPEND write() per record instead of the text layer's 8 KiB
+        # chunks, so a large entry is not interleaved with another appender's.
+        fd = os.open(abs_path, _APPEND_OPEN_FLAGS, 0o666)
+        try:
+            _write_all(fd, data)
+            _HEAD_CACHE[abs_path] = (_head_key(os.fstat(fd)), idx + 1, entry_hash)
+        finally:
+            os.close(fd)
 
     return LedgerEntry(idx=idx, prev_hash=prev_hash, entry_hash=entry_hash, payload=payload)
+
+
+class LedgerWriter:
+    """
+    Long-lived appender for bursts of records.
+
+    Keeps the ledger open and the chain head in memory, and writes records
+    in batches of ``batch_size`` (one write() per batch). With ``fsync``
+    set, every batch write is followed by an fsync, so each batch is durable
+    before append() returns. ``flush()`` and ``close()`` write (and fsync)
+    any partial batch. Records still pending are lost if the process dies,
+    so batch_size=1 (the default) writes every record as soon as it is
+    appended.
+
+    The writer must be the ledger's only appender while it is open: the
+    head is read once at construction and never re-read.
+
+    If a batch write fails, the records after the last good batch may be
+    missing or torn on disk while the in-memory head has already moved past
+    them. The writer is then marked failed: append() and flush() raise, and
+    close() only releases the file. Reopen the ledger to resume from the
+    head that is actually on disk.
+    """
+
+    def __init__(self, ledger_path: str, *, batch_size: int = 1, fsync: bool = False):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.path = os.path.abspath(ledger_path)
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._error: Optional[BaseException] = None
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd: Optional[int] = os.open(self.path, _APPEND_OPEN_FLAGS, 0o666)
+        try:
+            if os.fstat(self._fd).st_size:
+                self._idx, self._prev_hash = _scan_head(self.path)
+            else:
+                self._idx, self._prev_hash = 0, "0" * 64
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def append(
+        self,
+        *,
+        state: StateSnapshot,
+        proposal: Proposal,
+        decision: Decision,
+        results: Tuple[ExecResult, ...],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> LedgerEntry:
+        payload = _entry_payload(state, proposal, decision, results, meta)
+        with self._lock:
+            if self._fd is None:
+                raise ValueError("ledger writer is closed")
+            self._raise_if_failed()
+            idx, prev_hash = self._idx, self._prev_hash
+            entry_hash, data = _encode_record(idx, prev_hash, payload)
+            self._pending.append(data)
+            self._idx, self._prev_hash = idx + 1, entry_hash
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+        return LedgerEntry(idx=idx, prev_hash=prev_hash, entry_hash=entry_hash, payload=payload)
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"ledger writer failed to write {self.path}") from self._error
+
+    def _write_pending(self) -> None:
+        fd = self._fd
+        if fd is None or not self._pending:
+            return
+        try:
+            _write_all(fd, b"".join(self._pending))
+            if self.fsync:
+                os.fsync(fd)
+        except BaseException as e:
+            self._error = e
+            raise
+        finally:
+            self._pending.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._fd is None:
+                return
+            self._raise_if_failed()
+            self._write_pending()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is None:
+                return
+            try:
+                if self._error is None:
+                    self._write_pending()
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> "LedgerWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -6,11 +6,42 @@ Provides consistent, JSON-formatted logging for all kernel operations.
 """
 from __future__ import annotations
 
+import contextvars
 import json
 import logging
 import sys
-from datetime import datetime, timezone
-from typing import Any
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+# Fields added by active LogContext blocks. Per thread / asyncio task, so
+# one context's fields never leak into records logged elsewhere.
+_context_fields: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "rfsn_log_context", default=None
+)
+
+# Compact encoder built once instead of per record by json.dumps
+_encode_json = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+# Records arrive many per second, so the date/time part is formatted once
+# per second and only the microseconds are rendered per record.
+_last_second: Tuple[int, str] = (-1, "")
+
+
+def _format_timestamp(created: float) -> str:
+    """ISO-8601 UTC timestamp for LogRecord.created, e.g. 2024-01-01T00:00:00.000000+00:00."""
+    global _last_second
+    sec = int(created)
+    # Round half-even to the microsecond like datetime.fromtimestamp,
+    # carrying into the next second.
+    usec = round((created - sec) * 1e6)
+    if usec >= 1_000_000:
+        sec += 1
+        usec -= 1_000_000
+    cached = _last_second
+    if cached[0] != sec:
+        cached = _last_second = (sec, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec)))
+    return f"{cached[1]}.{usec:06d}+00:00"
 
 
 class StructuredFormatter(logging.Formatter):
@@ -18,13 +49,16 @@ class StructuredFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         log_entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": _format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
 
-        # Add extra fields if present
+        # Add LogContext fields, then per-record extra fields
+        fields = _context_fields.get()
+        if fields:
+            log_entry.update(fields)
         if hasattr(record, "extra"):
             log_entry.update(record.extra)
 
@@ -32,7 +66,7 @@ class StructuredFormatter(logging.Formatter):
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_entry, default=str)
+        return _encode_json(log_entry)
 
 
 def get_logger(name: str, structured: bool = True) -> logging.Logger:
@@ -68,30 +102,22 @@ def get_logger(name: str, structured: bool = True) -> logging.Logger:
 
 
 class LogContext:
-    """Context manager for adding fields to log messages."""
+    """Context manager for adding fields to structured log messages."""
 
     def __init__(self, logger: logging.Logger, **fields: Any):
         self.logger = logger
         self.fields = fields
-        self._old_factory = None
+        self._token: Optional[contextvars.Token] = None
 
     def __enter__(self):
-        old_factory = logging.getLogRecordFactory()
-        fields = self.fields
-
-        def record_factory(*args, **kwargs):
-            record = old_factory(*args, **kwargs)
-            record.extra = getattr(record, "extra", {})
-            record.extra.update(fields)
-            return record
-
-        self._old_factory = old_factory
-        logging.setLogRecordFactory(record_factory)
+        outer = _context_fields.get()
+        self._token = _context_fields.set({**outer, **self.fields} if outer else dict(self.fields))
         return self
 
     def __exit__(self, *args):
-        if self._old_factory:
-            logging.setLogRecordFactory(self._old_factory)
+        if self._token is not None:
+            _context_fields.reset(self._token)
+            self._token = None
 
 
 # Convenience functions for common log patterns
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
+import functools
 import os
 import re
 
@@ -15,6 +16,9 @@ class PatchFile:
 _DIFF_HEADER_RE = re.compile(r"^diff --git a/(.+?) b/(.+?)\s*$")
 _OLD_RE = re.compile(r"^---\s+(.*)\s*$")
 _NEW_RE = re.compile(r"^\+\+\+\s+(.*)\s*$")
+_HEADER_PREFIXES = ("diff --git a/", "---", "+++")
+_HEADER_MARKERS = tuple("\n" + p for p in _HEADER_PREFIXES)
+_DRIVE_RE = re.compile(r"[A-Za-z]:/")
 
 
 def _strip_prefix(p: str) -> str:
@@ -30,7 +34,7 @@ def _normalize_rel(p: str) -> str:
     if p == "/dev/null":
         return p
     # disallow absolute paths and drive letters
-    if p.startswith("/") or re.match(r"^[A-Za-z]:/", p):
+    if p.startswith("/") or _DRIVE_RE.match(p):
         raise ValueError(f"absolute path in patch: {p}")
     # collapse
     norm = os.path.normpath(p).replace("\\", "/")
@@ -43,6 +47,40 @@ def _normalize_rel(p: str) -> str:
     return norm
 
 
+def _iter_header_lines(patch_text: str) -> Iterator[str]:
+    """
+    Yield the lines of patch_text that start with a header prefix, in order.
+
+    Hunk bodies dominate large patches, so instead of splitting every line
+    this jumps between header candidates with str.find (one C-level scan per
+    marker) and slices only those lines.
+
+    Lines end at "\n" only, deliberately unlike str.splitlines(): git reads
+    patches line by line on "\n", so "\r", "\x0b", "\u2028" and the other
+    splitlines() boundaries are part of a line, both inside hunk bodies and
+    inside header paths. A trailing "\r" (CRLF patches) is left for the
+    header regexes to strip.
+    """
+    if patch_text.startswith(_HEADER_PREFIXES):
+        end = patch_text.find("\n")
+        yield patch_text if end == -1 else patch_text[:end]
+    # Next occurrence of each marker; a marker is only re-searched once the
+    # scan has moved past its cached position.
+    nxt = [patch_text.find(m) for m in _HEADER_MARKERS]
+    while True:
+        pos = min((p for p in nxt if p != -1), default=-1)
+        if pos == -1:
+            return
+        start = pos + 1
+        end = patch_text.find("\n", start)
+        if end == -1:
+            end = len(patch_text)
+        yield patch_text[start:end]
+        for i, p in enumerate(nxt):
+            if p != -1 and p < end:
+                nxt[i] = patch_text.find(_HEADER_MARKERS[i], end)
+
+
 def parse_unified_diff_files(patch_text: str) -> List[PatchFile]:
     """
     Parse a unified diff and extract file pairs.
@@ -59,8 +97,7 @@ def parse_unified_diff_files(patch_text: str) -> List[PatchFile]:
     last_old: Optional[str] = None
     last_new: Optional[str] = None
 
-    lines = patch_text.splitlines()
-    for line in lines:
+    for line in _iter_header_lines(patch_text):
         m = _DIFF_HEADER_RE.match(line)
         if m:
             a_path = _normalize_rel(_strip_prefix(f"a/{m.group(1)}"))
@@ -91,31 +128,51 @@ def parse_unified_diff_files(patch_text: str) -> List[PatchFile]:
     return files
 
 
-def patch_paths_are_confined(workspace: str, patch_text: str) -> Tuple[bool, str, List[PatchFile]]:
+@functools.lru_cache(maxsize=32)
+def _parse_unified_diff_files_cached(patch_text: str) -> Tuple[PatchFile, ...]:
+    """
+    Memoized parse. The gate and the controller both parse every APPLY_PATCH,
+    and agent loops resubmit identical patches; str hashes are cached by the
+    interpreter so a hit costs one compare. Only the pure parse is cached --
+    realpath confinement depends on the filesystem and is always re-run.
+    """
+    return tuple(parse_unified_diff_files(patch_text))
+
+
+def patch_paths_are_confined(
+    workspace: str,
+    patch_text: str,
+    *,
+    max_files: Optional[int] = None,
+) -> Tuple[bool, str, List[PatchFile]]:
     """
     Enforce that every touched file path (old/new) is inside the workspace when resolved.
     Also rejects absolute paths and traversal during parsing.
     Uses realpath to prevent symlink escapes.
+    If max_files is given, patches touching more files are rejected before
+    any path is resolved.
     """
     # Realpath confinement: prevents symlink escapes inside workspace.
     ws = os.path.realpath(workspace)
     try:
-        files = parse_unified_diff_files(patch_text)
+        files = list(_parse_unified_diff_files_cached(patch_text))
     except Exception as e:
         return False, f"patch parse rejected: {e}", []
 
     if not files:
         return False, "patch contains no file headers", []
+    if max_files is not None and len(files) > max_files:
+        return False, f"patch touches too many files: {len(files)} > {max_files}", files
+
+    # Prefix computed once per patch; each path is then one startswith
+    ws_prefix = ws if ws.endswith(os.sep) else ws + os.sep
 
     def in_ws(rel: str) -> bool:
         if rel == "/dev/null":
             return True
         # Resolve the target path through filesystem links.
         ap = os.path.realpath(os.path.join(ws, rel))
-        try:
-            return os.path.commonpath([ws, ap]) == ws
-        except ValueError:
-            return False
+        return ap == ws or ap.startswith(ws_prefix)
 
     for pf in files:
         for rel in (pf.old_path, pf.new_path):
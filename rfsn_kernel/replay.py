@@ -1,27 +1,55 @@
 # rfsn_kernel/replay.py
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+from typing import Optional
 
 from .types import StateSnapshot, Proposal, canonical_json, sha256_hex
 from .gate import gate
 
 
+# Records written by append_ledger are canonical_json(rec). With sorted keys
+# they are '{"entry_hash":"<64 hex>",' followed by the rest of the hashed
+# body, so the body bytes can be hashed as stored instead of re-serialized.
+_RECORD_PREFIX = b'{"entry_hash":"'
+_RECORD_PREFIX_LEN = len(_RECORD_PREFIX) + 64 + 2
+
+# Records run to tens of KB; a 1 MiB buffer reads the ledger in a few large
+# sequential read() calls instead of one per 8 KiB.
+_READ_BUFFER = 1 << 20
+
+
+def _stored_body_hash(line: bytes) -> Optional[str]:
+    """sha256 of the canonical body embedded in a stored record, or None if the line has another layout."""
+    if not line.startswith(_RECORD_PREFIX) or line[_RECORD_PREFIX_LEN - 2:_RECORD_PREFIX_LEN] != b'",':
+        return None
+    h = hashlib.sha256(b"{")
+    h.update(memoryview(line)[_RECORD_PREFIX_LEN:])
+    return h.hexdigest()
+
+
 def verify_ledger_chain(ledger_path: str) -> None:
     if not os.path.exists(ledger_path):
         raise RuntimeError(f"ledger missing: {ledger_path}")
 
     prev = "0" * 64
-    with open(ledger_path, "r", encoding="utf-8") as f:
+    with open(ledger_path, "rb", buffering=_READ_BUFFER) as f:
         for i, line in enumerate(f):
+            line = line.rstrip(b"\n")
             rec = json.loads(line)
             if rec["idx"] != i:
                 raise RuntimeError(f"bad idx at line {i}: {rec['idx']}")
             if rec["prev_hash"] != prev:
                 raise RuntimeError(f"bad prev_hash at idx {i}")
-            body = {"idx": rec["idx"], "prev_hash": rec["prev_hash"], "payload": rec["payload"]}
-            expect = sha256_hex(canonical_json(body))
+            # Fast path hashes the stored body; it must match both the parsed
+            # entry_hash and the one in the prefix. Other layouts (records
+            # written before records were canonical) are re-serialized.
+            expect = _stored_body_hash(line)
+            if expect is None or line[len(_RECORD_PREFIX):_RECORD_PREFIX_LEN - 2] != expect.encode("ascii"):
+                body = {"idx": rec["idx"], "prev_hash": rec["prev_hash"], "payload": rec["payload"]}
+                expect = sha256_hex(canonical_json(body))
             if rec["entry_hash"] != expect:
                 raise RuntimeError(f"bad hash at idx {i}")
             prev = rec["entry_hash"]
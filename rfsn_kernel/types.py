@@ -1,10 +1,12 @@
 # rfsn_kernel/types.py
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, Literal, Tuple
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Literal, Optional, Tuple
+import functools
 import json
 import hashlib
+import sys
 
 
 ActionType = Literal["READ_FILE", "WRITE_FILE", "APPLY_PATCH", "RUN_TESTS", "GREP", "LIST_DIR", "GIT_DIFF"]
@@ -21,6 +23,12 @@ class Action:
     type: ActionType
     payload: Dict[str, Any]
 
+    def __post_init__(self) -> None:
+        # Intern types decoded from JSON/LLM output so gate/controller
+        # comparisons against the literal action names hit the identity fast path.
+        if type(self.type) is str:
+            object.__setattr__(self, "type", sys.intern(self.type))
+
 
 @dataclass(frozen=True)
 class Proposal:
@@ -43,10 +51,12 @@ _GATE_SECRET = "rfsn_gate_authority_v1"
 
 def _compute_decision_sig(allowed: bool, reason: str, actions: Tuple[Action, ...]) -> str:
     """Compute signature binding decision to gate."""
+    # Same JSON as dataclass_to_dict(a), without asdict's deep copy of every
+    # payload (patches and file texts) just to serialize it once.
     content = canonical_json({
         "allowed": allowed,
         "reason": reason,
-        "actions": [dataclass_to_dict(a) for a in actions],
+        "actions": [{"type": a.type, "payload": a.payload} for a in actions],
         "secret": _GATE_SECRET,
     })
     return sha256_hex(content)[:16]  # 16 hex chars = 64 bits
@@ -69,20 +79,67 @@ class ExecResult:
     output: Dict[str, Any]
 
 
-def dataclass_to_dict(x: Any) -> Any:
+# JSON leaves returned as-is without a recursive call
+_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls))
+
+
+def dataclass_to_dict(x: Any, memo: Optional[Dict[int, Any]] = None) -> Any:
+    """
+    Convert dataclasses (recursively) to dicts for serialization.
+
+    Containers are walked but only copied when something inside them is a
+    dataclass: plain JSON data (payload, notes, meta, output) is returned
+    by reference, since the result is only read by canonical_json and
+    deep-copying large payloads bought nothing. Treat the result as
+    read-only.
+
+    Pass the same ``memo`` to convert several objects that share dataclass
+    instances (the Actions in a proposal, its decision and its results):
+    each instance is converted once and its dict reused. The memo is keyed
+    by id(), so it must not outlive the objects being converted.
+    """
     if hasattr(x, "__dataclass_fields__"):
-        return asdict(x)
-    if isinstance(x, tuple):
-        return [dataclass_to_dict(v) for v in x]
-    if isinstance(x, list):
-        return [dataclass_to_dict(v) for v in x]
+        if memo is None:
+            memo = {}
+        d = memo.get(id(x))
+        if d is None:
+            d = memo[id(x)] = {}
+            for name in _field_names(type(x)):
+                d[name] = dataclass_to_dict(getattr(x, name), memo)
+        return d
     if isinstance(x, dict):
-        return {k: dataclass_to_dict(v) for k, v in x.items()}
+        out: Optional[Dict[Any, Any]] = None
+        for k, v in x.items():
+            if type(v) in _SCALAR_TYPES:
+                continue
+            c = dataclass_to_dict(v, memo)
+            if c is not v:
+                if out is None:
+                    out = dict(x)
+                out[k] = c
+        return x if out is None else out
+    if isinstance(x, (tuple, list)):
+        items = [v if type(v) in _SCALAR_TYPES else dataclass_to_dict(v, memo) for v in x]
+        if any(c is not v for c, v in zip(items, x, strict=True)):
+            return items
+        return x
     return x
 
 
+# Built once: json.dumps constructs a new encoder per call for non-default
+# options. Kept on the stdlib encoder: its output is the hashed ledger and
+# signature format, and faster encoders (orjson) render floats, NaN and
+# non-str keys differently, which would break verification of old ledgers.
+_canonical_encode = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode
+
+
 def canonical_json(obj: Any) -> str:
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return _canonical_encode(obj)
 
 
 def sha256_hex(s: str) -> str:
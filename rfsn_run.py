@@ -14,7 +14,7 @@ from rfsn_kernel.replay import verify_ledger_chain, verify_gate_determinism
 from upstream_learner.bandit import ThompsonBandit, warm_start_from_outcomes
 from upstream_learner.prompt_bank import default_prompt_bank
 from upstream_learner.episode import run_episode
-from upstream_learner.outcomes_db import insert_outcome, get_summary, get_arm_stats
+from upstream_learner.outcomes_db import OutcomeWriter, get_summary, get_arm_stats
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -50,6 +50,9 @@ def main(argv: list[str] | None = None) -> int:
     if args.verbose:
         print(f"[bandit] loaded {len(bandit.arms)} arms, total pulls: {bandit.total_pulls}")
 
+    # Outcome inserts are committed by a background thread; closed before the summary below.
+    outcomes = OutcomeWriter(args.db_path)
+
     for ep in range(args.episodes):
         arm_id = bandit.choose(method=args.method)
 
@@ -68,8 +71,7 @@ def main(argv: list[str] | None = None) -> int:
 
         out = run_episode(ledger_path=args.ledger, state=state, proposal=proposal)
 
-        insert_outcome(
-            db_path=args.db_path,
+        outcomes.put(
             task_id=args.task_id,
             arm_id=arm_id,
             decision_status=out.decision_status,
@@ -85,6 +87,8 @@ def main(argv: list[str] | None = None) -> int:
         if args.verbose:
             print(f"  result: {out.decision_status}, reward={out.reward}, wall={out.wall_ms}ms")
 
+    outcomes.close()
+
     # Save bandit state
     bandit.save(args.bandit_path)
     if args.verbose:
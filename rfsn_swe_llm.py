@@ -21,7 +21,7 @@ import os
 import re
 import urllib.request
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
 
 def _normalize_chat_completions_url(base_or_full: str) -> str:
@@ -87,20 +87,16 @@ class LLMClient:
             raise RuntimeError("LLM_API_KEY is required")
         return LLMClient(api_key=api_key, model=model, base_url=base_url, timeout_s=timeout_s)
 
-    def complete(
+    def _build_request(
         self,
         *,
         prompt: str,
-        model: Optional[str] = None,
-        temperature: float = 0.2,
-        max_tokens: int = 1400,
-        seed: Optional[int] = None,
-    ) -> str:
-        """
-        OpenAI-compatible Chat Completions call.
-        Expects env:
-          LLM_BASE_URL, LLM_API_KEY, LLM_MODEL
-        """
+        model: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        seed: Optional[int],
+        stream: bool = False,
+    ) -> urllib.request.Request:
         url = _normalize_chat_completions_url(self.base_url or "")
         if not url:
             raise RuntimeError("LLM_BASE_URL missing")
@@ -118,8 +114,28 @@ class LLMClient:
         # Some providers accept seed; harmless to include if ignored.
         if seed is not None:
             payload["seed"] = int(seed)
+        if stream:
+            payload["stream"] = True
 
-        req = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"), headers=headers, method="POST")
+        return urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"), headers=headers, method="POST")
+
+    def complete(
+        self,
+        *,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.2,
+        max_tokens: int = 1400,
+        seed: Optional[int] = None,
+    ) -> str:
+        """
+        OpenAI-compatible Chat Completions call.
+        Expects env:
+          LLM_BASE_URL, LLM_API_KEY, LLM_MODEL
+        """
+        req = self._build_request(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens, seed=seed
+        )
 
         with urllib.request.urlopen(req, timeout=self.timeout_s) as resp:
             raw = resp.read().decode("utf-8", errors="replace")
@@ -147,3 +163,48 @@ class LLMClient:
 
         # Last resort: return json as text for debugging
         return raw
+
+    def complete_stream(
+        self,
+        *,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.2,
+        max_tokens: int = 1400,
+        seed: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming variant of complete(): yields content deltas as they arrive.
+
+        Uses the OpenAI-style server-sent events shape ("data: {...}" lines,
+        terminated by "data: [DONE]"). Lines that are not data events or do
+        not carry a content delta are skipped. "".join() of the chunks equals
+        what complete() would have returned for a well-behaved provider.
+        """
+        req = self._build_request(
+            prompt=prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            seed=seed,
+            stream=True,
+        )
+
+        with urllib.request.urlopen(req, timeout=self.timeout_s) as resp:
+            for raw_line in resp:
+                line = raw_line.decode("utf-8", errors="replace").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    obj = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                choices = obj.get("choices") if isinstance(obj, dict) else None
+                if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+                    continue
+                delta = choices[0].get("delta")
+                if isinstance(delta, dict) and isinstance(delta.get("content"), str):
+                    yield delta["content"]
@@ -6,6 +6,7 @@ import json
 
 from upstream_learner.bandit import ThompsonBandit, BetaArm, warm_start_from_outcomes
 from upstream_learner.outcomes_db import (
+    OutcomeWriter,
     insert_outcome,
     query_outcomes,
     get_arm_stats,
@@ -110,6 +111,84 @@ class TestOutcomesDB:
         assert rows[0].tests_passed is True
         assert rows[0].reward == 1.0
 
+    def test_outcome_writer_flushes_in_background(self, tmp_path):
+        db = tmp_path / "test.db"
+        writer = OutcomeWriter(str(db))
+
+        for i in range(5):
+            writer.put(
+                task_id="t",
+                arm_id="arm_a",
+                decision_status="ALLOW",
+                tests_passed=i % 2 == 0,
+                wall_ms=10,
+                reward=1.0,
+                meta={"episode": i},
+            )
+        writer.flush()
+        assert len(query_outcomes(str(db))) == 5
+
+        writer.close()
+        writer.close()  # idempotent
+        rows = query_outcomes(str(db), arm_id="arm_a")
+        assert sorted(r.meta["episode"] for r in rows) == [0, 1, 2, 3, 4]
+
+    def test_outcome_writer_surfaces_commit_errors(self, tmp_path):
+        import sqlite3
+
+        import pytest
+
+        db = tmp_path / "test.db"
+        writer = OutcomeWriter(str(db), maxsize=4)
+        with sqlite3.connect(str(db)) as cx:
+            cx.execute("DROP TABLE outcomes")
+
+        row = dict(
+            task_id="t", arm_id="a", decision_status="ALLOW", tests_passed=True, wall_ms=1, reward=1.0
+        )
+        writer.put(**row)
+        with pytest.raises(RuntimeError, match="failed to commit"):
+            writer.flush()
+
+        # The writer thread is still draining: more puts than the queue holds
+        # do not block, and close() reports the later failures.
+        for _ in range(10):
+            try:
+                writer.put(**row)
+            except RuntimeError:
+                pass
+        with pytest.raises(RuntimeError, match="failed to commit"):
+            writer.close()
+
+    def test_outcome_writer_survives_connect_failure(self, tmp_path, monkeypatch):
+        import sqlite3
+
+        import pytest
+
+        import upstream_learner.outcomes_db as outcomes_db
+
+        db = tmp_path / "test.db"
+        writer = OutcomeWriter(str(db), maxsize=2)
+
+        def broken_connect(*args, **kwargs):
+            raise sqlite3.OperationalError("unable to open database file")
+
+        monkeypatch.setattr(outcomes_db.sqlite3, "connect", broken_connect)
+        row = dict(
+            task_id="t", arm_id="a", decision_status="ALLOW", tests_passed=True, wall_ms=1, reward=1.0
+        )
+        writer.put(**row)
+        with pytest.raises(RuntimeError, match="failed to commit"):
+            writer.flush()
+
+        # The connect is retried with the next batch
+        monkeypatch.undo()
+        writer.put(**row)
+        writer.close()
+        assert len(query_outcomes(str(db))) == 1
+        with pytest.raises(RuntimeError, match="closed"):
+            writer.put(**row)
+
     def test_get_arm_stats(self, tmp_path):
         db = tmp_path / "test.db"
 
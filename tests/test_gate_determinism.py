@@ -21,3 +21,48 @@ def test_gate_is_deterministic_for_same_inputs(tmp_path):
     d0 = gate(state, proposal)
     for _ in range(20):
         assert gate(state, proposal) == d0
+
+
+def test_action_type_is_interned():
+    import json
+    import sys
+
+    decoded = json.loads('{"type": "READ_FILE"}')["type"]
+    a = Action(decoded, {"path": "x.txt"})
+    assert a.type is sys.intern("READ_FILE")
+    assert a == Action("READ_FILE", {"path": "x.txt"})
+
+
+def test_decision_sig_matches_dataclass_serialization():
+    from rfsn_kernel.types import (
+        _GATE_SECRET, _compute_decision_sig, canonical_json, dataclass_to_dict, sha256_hex,
+    )
+
+    actions = (
+        Action("WRITE_FILE", {"path": "a.py", "text": "x = 1\n"}),
+        Action("GIT_DIFF", {"paths": ["a.py"], "context_lines": 1}),
+    )
+    expected = sha256_hex(canonical_json({
+        "allowed": True,
+        "reason": "OK",
+        "actions": [dataclass_to_dict(a) for a in actions],
+        "secret": _GATE_SECRET,
+    }))[:16]
+    assert _compute_decision_sig(True, "OK", actions) == expected
+
+
+def test_dataclass_to_dict_converts_nested_dataclasses_in_json_fields():
+    from dataclasses import asdict
+
+    from rfsn_kernel.types import canonical_json, dataclass_to_dict
+
+    inner = Action("READ_FILE", {"path": "a.txt"})
+    plain = {"k": [1, "two", {"x": None}]}
+    proposal = Proposal(actions=(inner,), meta={"plain": plain, "nested": {"items": [inner]}})
+
+    d = dataclass_to_dict(proposal)
+    assert canonical_json(d) == canonical_json(asdict(proposal))
+    # Plain JSON data is shared; only containers holding dataclasses are copied
+    assert d["meta"]["plain"] is plain
+    assert d["meta"] is not proposal.meta
+    assert d["meta"]["nested"]["items"] == [{"type": "READ_FILE", "payload": {"path": "a.txt"}}]
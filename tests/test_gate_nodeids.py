@@ -91,3 +91,19 @@ class TestAllowedTestsArgv:
         """Nodeids with absolute paths should be rejected."""
         ws = str(tmp_path)
         assert is_allowed_tests_argv(["pytest", "-q", "/etc/passwd::test"], workspace=ws) is False
+
+
+def test_nodeid_pattern_rejects_embedded_newline(tmp_path):
+    from rfsn_kernel.gate import _tests_argv_nodeid_files
+
+    assert _tests_argv_nodeid_files(("pytest", "-q", "tests/test_foo.py::test_bar")) == ("tests/test_foo.py",)
+    assert _tests_argv_nodeid_files(("pytest", "-q", "tests/test_foo.py\nx")) is None
+    assert _tests_argv_nodeid_files(("pytest", "-q", "tests/test_foo.py::test bar")) is None
+
+
+def test_argv_rejects_embedded_nul(tmp_path):
+    """A NUL inside one token must not pass as an argv separator."""
+    ws = str(tmp_path)
+    assert is_allowed_tests_argv(["pytest\x00-q"], workspace=ws) is False
+    assert is_allowed_tests_argv(["pytest", "-q", "tests\x00a.py"], workspace=ws) is False
+    assert is_allowed_tests_argv(["pytest", "-q", "tests/a.py", "-x"], workspace=ws) is False
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from rfsn_kernel.types import StateSnapshot, Proposal, Action
 from rfsn_kernel.gate import gate
-from rfsn_kernel.ledger import append_ledger
+from rfsn_kernel.ledger import append_ledger, LedgerWriter
 from rfsn_kernel.replay import verify_ledger_chain
 
 
@@ -21,3 +21,179 @@ def test_ledger_hash_chain_verifies(tmp_path):
     append_ledger(str(ledger), state=state, proposal=proposal, decision=decision, results=(), meta={"k": 2})
 
     verify_ledger_chain(str(ledger))
+
+
+def test_ledger_head_cache_revalidates_after_external_change(tmp_path):
+    ledger = tmp_path / "ledger.jsonl"
+    ws = tmp_path / "repo"
+    ws.mkdir()
+    state = StateSnapshot(workspace=str(ws), notes={})
+    proposal = Proposal(actions=(), meta={})
+    decision = gate(state, proposal)
+
+    for k in range(3):
+        append_ledger(str(ledger), state=state, proposal=proposal, decision=decision, results=(), meta={"k": k})
+
+    # Drop the last record behind the writer's back; the next append must chain off idx 1
+    lines = ledger.read_bytes().splitlines(keepends=True)
+    ledger.write_bytes(b"".join(lines[:2]))
+    entry = append_ledger(str(ledger), state=state, proposal=proposal, decision=decision, results=(), meta={})
+
+    assert entry.idx == 2
+    verify_ledger_chain(str(ledger))
+
+
+def test_read_last_line_spans_windows(tmp_path, monkeypatch):
+    from rfsn_kernel import ledger as ledger_mod
+
+    monkeypatch.setattr(ledger_mod, "_TAIL_WINDOW", 4)
+    f = tmp_path / "l.jsonl"
+    f.write_bytes(b"first\n" + b"x" * 37 + b"\n")
+    with open(f, "rb") as fh:
+        assert ledger_mod._read_last_line(fh) == b"x" * 37
+    f.write_bytes(b"only-line")
+    with open(f, "rb") as fh:
+        assert ledger_mod._read_last_line(fh) == b"only-line"
+    f.write_bytes(b"")
+    with open(f, "rb") as fh:
+        assert ledger_mod._read_last_line(fh) == b""
+
+
+def test_ledger_record_is_canonical_json(tmp_path):
+    import json
+    from rfsn_kernel.types import canonical_json
+
+    ledger = tmp_path / "ledger.jsonl"
+    state = StateSnapshot(workspace=str(tmp_path), notes={"ü": 1})
+    proposal = Proposal(actions=(Action("READ_FILE", {"path": "a.txt"}),), meta={})
+    decision = gate(state, proposal)
+    entry = append_ledger(str(ledger), state=state, proposal=proposal, decision=decision, results=())
+
+    line = ledger.read_text(encoding="utf-8").rstrip("\n")
+    rec = json.loads(line)
+    assert line == canonical_json(rec)
+    assert rec["entry_hash"] == entry.entry_hash
+
+
+def test_ledger_writer_batches_and_continues_chain(tmp_path):
+    ledger = tmp_path / "ledger.jsonl"
+    state = StateSnapshot(workspace=str(tmp_path), notes={})
+    proposal = Proposal(actions=(Action("READ_FILE", {"path": "a.txt"}),), meta={})
+    decision = gate(state, proposal)
+
+    append_ledger(str(ledger), state=state, proposal=proposal, decision=decision, results=())
+
+    with LedgerWriter(str(ledger), batch_size=3) as writer:
+        entries = [
+            writer.append(state=state, proposal=proposal, decision=decision, results=(), meta={"k": i})
+            for i in range(4)
+        ]
+        # Three records flushed as one batch, the fourth still pending
+        assert len(ledger.read_text(encoding="utf-8").splitlines()) == 4
+    assert len(ledger.read_text(encoding="utf-8").splitlines()) == 5
+    assert [e.idx for e in entries] == [1, 2, 3, 4]
+
+    # The function API picks the head up after the writer's records
+    entry = append_ledger(str(ledger), state=state, proposal=proposal, decision=decision, results=())
+    assert entry.idx == 5 and entry.prev_hash == entries[-1].entry_hash
+    verify_ledger_chain(str(ledger))
+
+
+def test_entry_payload_converts_shared_actions_once(tmp_path):
+    from dataclasses import asdict
+    from rfsn_kernel.ledger import _entry_payload
+    from rfsn_kernel.types import ExecResult, canonical_json
+
+    state = StateSnapshot(workspace=str(tmp_path), notes={})
+    proposal = Proposal(actions=(Action("READ_FILE", {"path": "a.txt"}),), meta={})
+    decision = gate(state, proposal)
+    results = (ExecResult(ok=True, action=proposal.actions[0], output={"text": "a"}),)
+
+    payload = _entry_payload(state, proposal, decision, results)
+    action = payload["proposal"]["actions"][0]
+    assert payload["decision"]["approved_actions"][0] is action
+    assert payload["results"][0]["action"] is action
+    # JSON dict fields are referenced, not deep-copied
+    assert action["payload"] is proposal.actions[0].payload
+    assert canonical_json(payload["decision"]) == canonical_json(asdict(decision))
+
+
+def test_verify_detects_tampering_and_accepts_legacy_layout(tmp_path):
+    import json
+
+    import pytest
+
+    ledger = tmp_path / "ledger.jsonl"
+    state = StateSnapshot(workspace=str(tmp_path), notes={})
+    proposal = Proposal(actions=(Action("READ_FILE", {"path": "a.txt"}),), meta={})
+    decision = gate(state, proposal)
+    for k in range(2):
+        append_ledger(str(ledger), state=state, proposal=proposal, decision=decision, results=(), meta={"k": k})
+    lines = ledger.read_text(encoding="utf-8").splitlines()
+
+    # Records written with json.dumps' default layout still verify
+    ledger.write_text("".join(json.dumps(json.loads(line)) + "\n" for line in lines), encoding="utf-8")
+    verify_ledger_chain(str(ledger))
+
+    ledger.write_text(lines[0] + "\n" + lines[1].replace('"k":1', '"k":2') + "\n", encoding="utf-8")
+    with pytest.raises(RuntimeError, match="bad hash at idx 1"):
+        verify_ledger_chain(str(ledger))
+
+
+def test_ledger_writer_fsyncs_every_batch(tmp_path, monkeypatch):
+    import os
+
+    synced = []
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd))
+
+    state = StateSnapshot(workspace=str(tmp_path), notes={})
+    proposal = Proposal(actions=(Action("READ_FILE", {"path": "a.txt"}),), meta={})
+    decision = gate(state, proposal)
+
+    with LedgerWriter(str(tmp_path / "ledger.jsonl"), batch_size=2, fsync=True) as writer:
+        for i in range(5):
+            writer.append(state=state, proposal=proposal, decision=decision, results=(), meta={"k": i})
+        # Two full batches written, each fsync'd before append() returned
+        assert len(synced) == 2
+    # close() writes and fsyncs the partial batch
+    assert len(synced) == 3
+
+
+def test_ledger_writer_refuses_appends_after_failed_write(tmp_path, monkeypatch):
+    import errno
+
+    import pytest
+
+    import rfsn_kernel.ledger as ledger_mod
+
+    ledger = tmp_path / "ledger.jsonl"
+    state = StateSnapshot(workspace=str(tmp_path), notes={})
+    proposal = Proposal(actions=(), meta={})
+    decision = gate(state, proposal)
+    real_write_all = ledger_mod._write_all
+    calls = []
+
+    def flaky_write_all(fd, data):
+        calls.append(data)
+        if len(calls) == 2:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        real_write_all(fd, data)
+
+    monkeypatch.setattr(ledger_mod, "_write_all", flaky_write_all)
+
+    with LedgerWriter(str(ledger)) as writer:
+        writer.append(state=state, proposal=proposal, decision=decision, results=(), meta={"k": 0})
+        with pytest.raises(OSError):
+            writer.append(state=state, proposal=proposal, decision=decision, results=(), meta={"k": 1})
+        # The head moved past the lost record: chaining further would corrupt the ledger
+        with pytest.raises(RuntimeError, match="failed to write"):
+            writer.append(state=state, proposal=proposal, decision=decision, results=(), meta={"k": 2})
+        with pytest.raises(RuntimeError, match="failed to write"):
+            writer.flush()
+    verify_ledger_chain(str(ledger))
+
+    # A fresh writer resumes from the head on disk
+    with LedgerWriter(str(ledger)) as writer:
+        entry = writer.append(state=state, proposal=proposal, decision=decision, results=())
+    assert entry.idx == 1
+    verify_ledger_chain(str(ledger))
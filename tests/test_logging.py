@@ -0,0 +1,105 @@
+# tests/test_logging.py
+"""Tests for structured logging: LogContext fields and record timestamps."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+
+from rfsn_kernel.logging import LogContext, StructuredFormatter, _context_fields, _format_timestamp
+
+
+def _format(msg: str = "m", **extra) -> dict:
+    record = logging.LogRecord("rfsn.test", logging.INFO, __file__, 1, msg, None, None)
+    if extra:
+        record.extra = extra
+    return json.loads(StructuredFormatter().format(record))
+
+
+def test_log_context_nested_merge_and_restore():
+    logger = logging.getLogger("rfsn.test")
+    assert "task" not in _format()
+
+    with LogContext(logger, task="t1", arm="a"):
+        assert _format()["task"] == "t1"
+        with LogContext(logger, arm="b", step=2):
+            entry = _format()
+            assert (entry["task"], entry["arm"], entry["step"]) == ("t1", "b", 2)
+            # Per-record extra fields win over context fields
+            assert _format(arm="c")["arm"] == "c"
+        entry = _format()
+        assert (entry["task"], entry["arm"]) == ("t1", "a")
+        assert "step" not in entry
+
+    entry = _format()
+    assert "task" not in entry and "arm" not in entry
+
+
+def test_log_context_resets_on_exception_exit():
+    logger = logging.getLogger("rfsn.test")
+    try:
+        with LogContext(logger, task="t1"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert _context_fields.get() is None
+
+    ctx = LogContext(logger, task="t2")
+    with ctx:
+        pass
+    ctx.__exit__(None, None, None)  # a second exit is a no-op
+    assert _context_fields.get() is None
+
+
+def test_log_context_fields_do_not_leak_across_threads():
+    logger = logging.getLogger("rfsn.test")
+    entered = threading.Event()
+    done = threading.Event()
+    seen = {}
+
+    def worker():
+        with LogContext(logger, task="worker"):
+            entered.set()
+            done.wait(5)
+            seen["worker"] = _format()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    assert entered.wait(5)
+    try:
+        with LogContext(logger, arm="main"):
+            seen["main"] = _format()
+    finally:
+        done.set()
+        t.join(5)
+
+    assert seen["main"]["arm"] == "main" and "task" not in seen["main"]
+    assert seen["worker"]["task"] == "worker" and "arm" not in seen["worker"]
+
+
+def test_format_timestamp_matches_datetime_across_second_boundary():
+    base = 1_700_000_000
+    created_values = [
+        base - 0.0000004,
+        base,
+        base + 0.0000004,
+        base + 0.0000005,
+        base + 0.4030926,
+        base + 0.9999994,
+        base + 0.9999995,  # rounds up into the next second
+        base + 0.9999999,
+        base + 1.0000001,
+        base + 1.5,
+    ]
+    # Interleave so the per-second cache is hit, missed and re-filled
+    for created in created_values + created_values[::-1]:
+        expected = datetime.fromtimestamp(created, timezone.utc).isoformat(timespec="microseconds")
+        assert _format_timestamp(created) == expected, created
+
+
+def test_structured_formatter_stamps_record_creation_time():
+    record = logging.LogRecord("rfsn.test", logging.INFO, __file__, 1, "m", None, None)
+    record.created = 1_700_000_000.25
+    entry = json.loads(StructuredFormatter().format(record))
+    assert entry["timestamp"] == "2023-11-14T22:13:20.250000+00:00"
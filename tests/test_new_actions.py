@@ -7,6 +7,7 @@ import pytest
 
 from rfsn_kernel.types import StateSnapshot, Action, Proposal
 from rfsn_kernel.gate import gate
+from rfsn_kernel import controller
 from rfsn_kernel.controller import execute_decision
 
 
@@ -76,6 +77,52 @@ class TestGrepAction:
         assert not decision.allowed
         assert "empty" in decision.reason or "GREP rejected" in decision.reason
 
+    @pytest.mark.skipif(controller._RG_BIN is None, reason="ripgrep not installed")
+    def test_grep_rg_matches_gnu_fallback(self, git_workspace, monkeypatch):
+        (git_workspace / "node_modules").mkdir()
+        (git_workspace / "node_modules" / "dep.py").write_text("hello = 1\n")
+        (git_workspace / "notes.bin").write_text("hello\n")
+
+        rg_out = controller._grep(str(git_workspace), "hello", fixed_string=True)
+        monkeypatch.setattr(controller, "_RG_BIN", None)
+        gnu_out = controller._grep(str(git_workspace), "hello", fixed_string=True)
+
+        assert rg_out["ok"] and gnu_out["ok"]
+        assert sorted(rg_out["matches"]) == sorted(gnu_out["matches"])
+        assert not any("node_modules" in m or "notes.bin" in m for m in rg_out["matches"])
+
+    def test_grep_reports_invalid_pattern(self, git_workspace, monkeypatch):
+        monkeypatch.setattr(controller, "_RG_BIN", None)
+        out = controller._grep(str(git_workspace), "hello(")
+        assert out["ok"] is False
+        assert out["error"].startswith("grep failed:")
+        # No match is not an error
+        out = controller._grep(str(git_workspace), "no_such_text_anywhere", fixed_string=True)
+        assert out["ok"] and out["matches"] == []
+
+    def test_grep_falls_back_to_gnu_when_rg_rejects(self, git_workspace, tmp_path, monkeypatch):
+        fake_rg = tmp_path / "rg"
+        fake_rg.write_text("#!/bin/sh\necho 'regex parse error' >&2\nexit 2\n")
+        fake_rg.chmod(0o755)
+        monkeypatch.setattr(controller, "_RG_BIN", str(fake_rg))
+
+        # Backreference: valid ERE, rejected by rg's regex engine
+        out = controller._grep(str(git_workspace), r"(l)\1")
+        assert out["ok"]
+        assert any(m.endswith("def hello():") for m in out["matches"])
+
+    def test_rg_json_line_skips_malformed_records(self):
+        assert controller._rg_json_line(b'{"type": "match", "data": {"path"') is None
+        assert controller._rg_json_line(b'["not", "a", "record"]') is None
+        assert controller._rg_json_line(b'{"type": "match", "data": {}}') is None
+
+    def test_grep_caps_results(self, git_workspace):
+        (git_workspace / "many.py").write_text("hit\n" * (controller._MAX_GREP_RESULTS + 50))
+        out = controller._grep(str(git_workspace), "hit", fixed_string=True)
+        assert out["ok"]
+        assert out["count"] == controller._MAX_GREP_RESULTS
+        assert out["truncated"] is True
+
 
 class TestListDirAction:
     def test_list_dir_root(self, git_workspace):
@@ -95,6 +142,18 @@ class TestListDirAction:
         assert "bar.py" in names
         assert "subdir" in names
 
+    def test_list_dir_entry_types(self, git_workspace):
+        (git_workspace / "link_to_subdir").symlink_to(git_workspace / "subdir")
+        state = StateSnapshot(workspace=str(git_workspace), notes={})
+        decision = gate(state, Proposal(actions=(Action(type="LIST_DIR", payload={}),), meta={}))
+        results = execute_decision(state, decision)
+        by_name = {e["name"]: e for e in results[0].output["entries"]}
+        assert by_name["foo.py"] == {"name": "foo.py", "type": "file", "size": len("def hello():\n    return 'world'\n")}
+        assert by_name["subdir"] == {"name": "subdir", "type": "dir"}
+        assert by_name["link_to_subdir"]["type"] == "dir"
+        names = [e["name"] for e in results[0].output["entries"]]
+        assert names == sorted(names)
+
     def test_list_dir_subdir(self, git_workspace):
         state = StateSnapshot(workspace=str(git_workspace), notes={})
         action = Action(type="LIST_DIR", payload={"path": "subdir"})
@@ -182,3 +241,67 @@ class TestGitDiffAction:
         assert len(results) == 1
         assert not results[0].ok
         assert "not a git repo" in results[0].output["error"]
+
+
+class TestConcurrentExecution:
+    def test_results_keep_order_across_write_barrier(self, git_workspace):
+        state = StateSnapshot(workspace=str(git_workspace), notes={})
+        actions = (
+            Action(type="READ_FILE", payload={"path": "foo.py"}),
+            Action(type="LIST_DIR", payload={"path": "subdir"}),
+            Action(type="READ_FILE", payload={"path": "bar.py"}),
+            Action(type="WRITE_FILE", payload={"path": "new.txt", "text": "fresh"}),
+            Action(type="READ_FILE", payload={"path": "new.txt"}),
+            Action(type="GREP", payload={"pattern": "fresh", "fixed_string": True}),
+            Action(type="READ_FILE", payload={"path": "subdir/baz.py"}),
+        )
+        decision = gate(state, Proposal(actions=actions, meta={}))
+        assert decision.allowed
+
+        results = execute_decision(state, decision)
+        assert [r.action for r in results] == list(actions)
+        assert all(r.ok for r in results)
+        assert "hello" in results[0].output["text"]
+        assert results[4].output["text"] == "fresh"
+        assert results[6].output["text"].startswith("# nested")
+
+    def test_first_failure_in_batch_is_raised(self, git_workspace):
+        state = StateSnapshot(workspace=str(git_workspace), notes={})
+        actions = (
+            Action(type="READ_FILE", payload={"path": "foo.py"}),
+            Action(type="READ_FILE", payload={"path": "missing.py"}),
+            Action(type="READ_FILE", payload={"path": "bar.py"}),
+        )
+        decision = gate(state, Proposal(actions=actions, meta={}))
+        with pytest.raises(FileNotFoundError):
+            execute_decision(state, decision)
+
+
+class TestApplyPatchAtomic:
+    def test_failing_hunk_leaves_tree_untouched(self, git_workspace):
+        # First file applies cleanly, second does not: nothing may be written.
+        patch = (
+            "diff --git a/foo.py b/foo.py\n"
+            "--- a/foo.py\n"
+            "+++ b/foo.py\n"
+            "@@ -1,2 +1,2 @@\n"
+            " def hello():\n"
+            "-    return 'world'\n"
+            "+    return 'patched'\n"
+            "diff --git a/bar.py b/bar.py\n"
+            "--- a/bar.py\n"
+            "+++ b/bar.py\n"
+            "@@ -1,2 +1,2 @@\n"
+            " import nope\n"
+            "-print(nope)\n"
+            "+print(nope())\n"
+        )
+        state = StateSnapshot(workspace=str(git_workspace), notes={})
+        decision = gate(state, Proposal(actions=(Action(type="APPLY_PATCH", payload={"patch": patch}),), meta={}))
+        assert decision.allowed
+
+        results = execute_decision(state, decision)
+        assert not results[0].ok
+        assert results[0].output["reason"] == "patch failed git apply"
+        assert (git_workspace / "foo.py").read_text() == "def hello():\n    return 'world'\n"
+        assert not list(git_workspace.rglob("*.rej"))
@@ -69,3 +69,65 @@ index 1111111..2222222 100644
     ok, reason, _files = patch_paths_are_confined(str(ws), patch)
     assert not ok, reason
     assert "escapes workspace" in reason
+
+
+def test_patch_confined_rejects_sibling_with_shared_prefix(tmp_path):
+    """A symlink to "ws-other" must not pass as inside "ws" by string prefix."""
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    sibling = tmp_path / "ws-other"
+    sibling.mkdir()
+    (ws / "link").symlink_to(sibling)
+
+    patch = """--- a/link/x.txt
++++ b/link/x.txt
+@@ -0,0 +1 @@
++new
+"""
+    ok, reason, _files = patch_paths_are_confined(str(ws), patch)
+    assert not ok
+    assert "escapes workspace" in reason
+
+
+def test_patch_confined_rejects_too_many_files(tmp_path):
+    patch = "".join(f"--- a/f{i}.txt\n+++ b/f{i}.txt\n@@ -1 +1 @@\n-a\n+b\n" for i in range(3))
+    ok, reason, files = patch_paths_are_confined(str(tmp_path), patch, max_files=2)
+    assert not ok
+    assert "too many files" in reason
+    assert len(files) == 3
+    assert patch_paths_are_confined(str(tmp_path), patch, max_files=3)[0]
+
+
+def test_gate_rejects_oversized_patch_before_parsing(tmp_path):
+    from rfsn_kernel.gate import _MAX_PATCH_BYTES, gate
+    from rfsn_kernel.types import Action, Proposal, StateSnapshot
+
+    patch = "--- a/x.txt\n+++ b/x.txt\n@@ -1 +1 @@\n-a\n+" + "b" * _MAX_PATCH_BYTES + "\n"
+    state = StateSnapshot(workspace=str(tmp_path), notes={})
+    decision = gate(state, Proposal(actions=(Action("APPLY_PATCH", {"patch": patch}),), meta={}))
+    assert not decision.allowed
+    assert "size cap" in decision.reason
+
+
+def test_parse_headers_split_on_newline_only():
+    from rfsn_kernel.patch_safety import PatchFile, parse_unified_diff_files
+
+    # CRLF headers parse; a bare "\r" inside a hunk line does not start a header (as in git)
+    patch = "--- a/x.txt\r\n+++ b/x.txt\r\n@@ -1 +1 @@\r\n-a\r+++ b/../evil\r\n+b\r\n"
+    assert parse_unified_diff_files(patch) == [PatchFile(old_path="x.txt", new_path="x.txt")]
+    assert parse_unified_diff_files("+++ b/y.txt") == []
+
+
+def test_parse_headers_keep_non_newline_line_boundaries():
+    from rfsn_kernel.patch_safety import PatchFile, parse_unified_diff_files
+
+    # "\x0b" and "\u2028" end a line for str.splitlines() but not for git:
+    # they can neither start a header inside a hunk line ...
+    patch = "--- a/x.txt\n+++ b/x.txt\n@@ -1 +1 @@\n-a\x0b+++ b/../evil\n+b\u2028--- /etc/passwd\n"
+    assert parse_unified_diff_files(patch) == [PatchFile(old_path="x.txt", new_path="x.txt")]
+
+    # ... nor cut a header path short
+    patch = "--- a/we\u2028ird.txt\n+++ b/we\u2028ird.txt\n@@ -1 +1 @@\n-a\n+b\n"
+    assert parse_unified_diff_files(patch) == [
+        PatchFile(old_path="we\u2028ird.txt", new_path="we\u2028ird.txt")
+    ]
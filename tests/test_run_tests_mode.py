@@ -73,3 +73,82 @@ def test_gate_rejects_non_string_mode(tmp_path):
     d = gate(st, prop)
     assert d.allowed is False
     assert "mode must be string" in d.reason
+
+
+def test_run_capped_keeps_only_output_tail(tmp_path):
+    """Streaming capture should keep the tail of large outputs, not the whole pipe."""
+    import sys
+    from rfsn_kernel.controller import _run_capped
+
+    script = "import sys; sys.stdout.write('x' * 500000 + 'END'); sys.stderr.write('err')"
+    rc, out, err = _run_capped([sys.executable, "-c", script], cwd=str(tmp_path), cap_bytes=1000)
+    assert rc == 0
+    assert len(out) == 1000
+    assert out.endswith(b"END")
+    assert err == b"err"
+
+
+def test_run_capped_feeds_stdin_and_times_out(tmp_path):
+    import subprocess
+    import sys
+    from rfsn_kernel.controller import _run_capped
+
+    rc, out, _ = _run_capped(
+        [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"],
+        cwd=str(tmp_path),
+        cap_bytes=100,
+        input_bytes=b"patch",
+    )
+    assert (rc, out) == (0, b"PATCH")
+
+    rc, _, _ = _run_capped(
+        [sys.executable, "-c", "raise SystemExit(3)"],
+        cwd=str(tmp_path),
+        cap_bytes=100,
+        timeout_s=10,
+    )
+    assert rc == 3
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        _run_capped(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            cwd=str(tmp_path),
+            cap_bytes=100,
+            timeout_s=0.5,
+        )
+
+
+def test_run_capped_timeout_kills_grandchild_holding_pipe(tmp_path):
+    """A background grandchild keeping stdout open must not outlast the timeout."""
+    import subprocess
+    import time
+    from rfsn_kernel.controller import _run_capped
+
+    marker = tmp_path / "survived"
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        _run_capped(
+            ["sh", "-c", f"(sleep 2; touch {marker}) & sleep 30"],
+            cwd=str(tmp_path),
+            cap_bytes=100,
+            timeout_s=0.5,
+        )
+    assert time.monotonic() - start < 5
+    # The whole process group was killed, grandchild included
+    time.sleep(2.5)
+    assert not marker.exists()
+
+    # Child exits at once but leaves the pipe open: bounded by the timeout too
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        _run_capped(["sh", "-c", "sleep 30 &"], cwd=str(tmp_path), cap_bytes=100, timeout_s=0.5)
+    assert time.monotonic() - start < 5
+
+
+def test_tail_bytes_starts_on_utf8_boundary():
+    from rfsn_kernel.controller import _tail_bytes
+
+    data = ("é" * 10).encode("utf-8")  # 2 bytes per char
+    assert _tail_bytes(data, 5).decode("utf-8") == "éé"
+    assert _tail_bytes(data, 4).decode("utf-8") == "éé"
+    assert _tail_bytes(b"abc", 10) == b"abc"
@@ -2,6 +2,8 @@
 """Tests for security hardening: realpath, write caps, symlink escape."""
 from __future__ import annotations
 
+import pytest
+
 from rfsn_kernel.gate import (
     gate,
     is_allowed_tests_argv,
@@ -122,6 +124,58 @@ class TestGateSymlinkEscape:
         assert d.allowed is False
         assert "symlink" in d.reason.lower()
 
+    def test_read_file_follows_symlink_inside_workspace(self, tmp_path):
+        from rfsn_kernel.controller import execute_decision
+
+        ws = tmp_path / "ws"
+        ws.mkdir()
+        (ws / "real.txt").write_text("inside", encoding="utf-8")
+        (ws / "link.txt").symlink_to(ws / "real.txt")
+
+        st = StateSnapshot(workspace=str(ws), notes={})
+        prop = Proposal(actions=(Action("READ_FILE", {"path": "link.txt"}),), meta={})
+        d = gate(st, prop)
+        assert d.allowed is True
+        results = execute_decision(st, d)
+        assert results[0].output["text"] == "inside"
+
+
+class TestControllerConfinement:
+    def test_resolve_in_workspace(self, tmp_path):
+        from rfsn_kernel.controller import _resolve_in_workspace
+
+        ws = tmp_path / "ws"
+        ws.mkdir()
+        (tmp_path / "ws-sibling").mkdir()
+        (ws / "escape").symlink_to(tmp_path / "ws-sibling")
+
+        assert _resolve_in_workspace(str(ws), "a/b.py") == str(ws / "a" / "b.py")
+        assert _resolve_in_workspace(str(ws), ".") == str(ws)
+        # Sibling sharing the workspace name as a string prefix must not pass
+        assert _resolve_in_workspace(str(ws), "escape") is None
+        assert _resolve_in_workspace("/", "etc") == "/etc"
+
+
+class TestReadCap:
+    def test_read_file_cap(self, tmp_path):
+        import pytest as pt
+        from rfsn_kernel.controller import _read_file
+
+        f = tmp_path / "data.bin"
+        f.write_bytes(b"x" * 10)
+        assert _read_file(str(f), cap_bytes=10) == "x" * 10
+        with pt.raises(RuntimeError, match="read cap exceeded"):
+            _read_file(str(f), cap_bytes=9)
+
+    def test_read_file_refuses_final_symlink(self, tmp_path):
+        import pytest as pt
+        from rfsn_kernel.controller import _read_file
+
+        (tmp_path / "real.txt").write_text("x", encoding="utf-8")
+        (tmp_path / "link.txt").symlink_to(tmp_path / "real.txt")
+        with pt.raises(OSError):
+            _read_file(str(tmp_path / "link.txt"))
+
 
 class TestNodeidValidation:
     def test_nodeid_with_traversal_rejected(self, tmp_path):
@@ -171,6 +225,18 @@ class TestNodeidValidation:
             workspace=str(ws),
         ) is True
 
+    def test_cached_argv_still_rechecks_realpath(self, tmp_path):
+        """Memoized argv parse must not cache the realpath verdict."""
+        ws = tmp_path / "ws"
+        ws.mkdir()
+        (ws / "tests").mkdir()
+        argv = ["pytest", "-q", "tests/test_esc.py::test_x"]
+        assert is_allowed_tests_argv(argv, workspace=str(ws)) is True
+
+        (tmp_path / "outside.py").write_text("def test_x(): pass", encoding="utf-8")
+        (ws / "tests" / "test_esc.py").symlink_to(tmp_path / "outside.py")
+        assert is_allowed_tests_argv(argv, workspace=str(ws)) is False
+
 
 class TestDecisionSignature:
     """Tests for decision signature verification - gate is FINAL AUTHORITY."""
@@ -223,3 +289,115 @@ class TestDecisionSignature:
         results = execute_decision(state, decision)
         assert len(results) == 1
         assert results[0].ok
+
+
+class TestReadCache:
+    @pytest.fixture
+    def settled(self, monkeypatch):
+        """Treat every file as settled (ctime cannot be backdated in a test)."""
+        monkeypatch.setattr("rfsn_kernel.controller._READ_CACHE_RACY_NS", -10**18)
+
+    @staticmethod
+    def _cached_paths():
+        from rfsn_kernel.controller import _READ_CACHE
+
+        return {k[0] for k in _READ_CACHE}
+
+    def test_read_cache_skips_racily_recent_files(self, tmp_path):
+        from rfsn_kernel.controller import _read_file
+
+        fresh = tmp_path / "fresh.txt"
+        fresh.write_text("new", encoding="utf-8")
+        assert _read_file(str(fresh)) == "new"
+        # Modified within the timestamp-granularity window: not cached
+        assert str(fresh) not in self._cached_paths()
+
+    def test_read_cache_evicted_by_write(self, tmp_path, settled):
+        from rfsn_kernel.controller import _read_file, _write_file
+
+        f = tmp_path / "cfg.txt"
+        f.write_text("x = 1", encoding="utf-8")
+        assert _read_file(str(f)) == "x = 1"
+        assert str(f) in self._cached_paths()
+
+        # Same size; with coarse timestamps the stamps can be unchanged,
+        # so the write itself must drop the entry
+        _write_file(str(f), "x = 2")
+        assert str(f) not in self._cached_paths()
+        assert _read_file(str(f)) == "x = 2"
+
+    def test_read_cache_evicted_by_apply_patch(self, tmp_path, settled):
+        import os
+        import subprocess
+
+        import pytest as pt
+        from rfsn_kernel.controller import _apply_patch_minimal, _read_file
+
+        if subprocess.run(["git", "init", "-q", str(tmp_path)]).returncode != 0:
+            pt.skip("git unavailable")
+        f = tmp_path / "mod.py"
+        f.write_text("x = 1\n", encoding="utf-8")
+        path = os.path.realpath(f)
+        assert _read_file(path) == "x = 1\n"
+        assert path in self._cached_paths()
+
+        patch = "--- a/mod.py\n+++ b/mod.py\n@@ -1 +1 @@\n-x = 1\n+x = 2\n"
+        assert _apply_patch_minimal(str(tmp_path), patch)["applied"]
+        assert path not in self._cached_paths()
+        assert _read_file(path) == "x = 2\n"
+
+
+class TestWriteResolution:
+    def _write(self, ws, rel, text):
+        from rfsn_kernel.controller import execute_decision
+
+        st = StateSnapshot(workspace=str(ws), notes={})
+        prop = Proposal(actions=(Action("WRITE_FILE", {"path": rel, "text": text}),), meta={})
+        d = gate(st, prop)
+        assert d.allowed is True
+        return execute_decision(st, d)
+
+    def test_write_new_file_in_new_dir(self, tmp_path):
+        self._write(tmp_path, "a/b/new.txt", "hi")
+        assert (tmp_path / "a" / "b" / "new.txt").read_text(encoding="utf-8") == "hi"
+
+    def test_write_through_symlink_inside_workspace(self, tmp_path):
+        (tmp_path / "real.txt").write_text("old", encoding="utf-8")
+        (tmp_path / "link.txt").symlink_to(tmp_path / "real.txt")
+        self._write(tmp_path, "link.txt", "new")
+        assert (tmp_path / "link.txt").is_symlink()
+        assert (tmp_path / "real.txt").read_text(encoding="utf-8") == "new"
+
+    def test_controller_rejects_symlink_swapped_after_gate(self, tmp_path):
+        import pytest as pt
+        from rfsn_kernel.controller import execute_decision
+
+        ws = tmp_path / "ws"
+        ws.mkdir()
+        outside = tmp_path / "outside.txt"
+        st = StateSnapshot(workspace=str(ws), notes={})
+        prop = Proposal(actions=(Action("WRITE_FILE", {"path": "f.txt", "text": "pwned"}),), meta={})
+        d = gate(st, prop)
+        assert d.allowed is True
+        (ws / "f.txt").symlink_to(outside)
+        with pt.raises(RuntimeError, match="escapes via symlink"):
+            execute_decision(st, d)
+        assert not outside.exists()
+
+
+def test_utf8_len_matches_encode():
+    from rfsn_kernel.gate import _utf8_len
+
+    for text in ("", "ascii only", "héllo", "☃ snow"):
+        assert _utf8_len(text) == len(text.encode("utf-8"))
+
+
+def test_gate_rejects_unpaired_surrogate_write(tmp_path):
+    st = StateSnapshot(workspace=str(tmp_path), notes={})
+    prop = Proposal(
+        actions=(Action("WRITE_FILE", {"path": "a.txt", "text": "x\ud800y"}),),
+        meta={},
+    )
+    d = gate(st, prop)
+    assert d.allowed is False
+    assert "not valid UTF-8" in d.reason
@@ -0,0 +1,62 @@
+# tests/test_swe_llm.py
+"""Tests for the SSE streaming parser in rfsn_swe_llm.LLMClient."""
+from __future__ import annotations
+
+import io
+import json
+
+import rfsn_swe_llm
+from rfsn_swe_llm import LLMClient
+
+
+class _FakeStream(io.BytesIO):
+    """urlopen() stand-in: a context manager iterating raw response lines."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _chunk(content=None, **delta):
+    if content is not None:
+        delta["content"] = content
+    return "data: " + json.dumps({"choices": [{"delta": delta}]})
+
+
+def _stream(monkeypatch, lines):
+    seen = {}
+
+    def fake_urlopen(req, timeout=None):
+        seen["body"] = json.loads(req.data)
+        return _FakeStream("".join(line + "\n" for line in lines).encode("utf-8"))
+
+    monkeypatch.setattr(rfsn_swe_llm.urllib.request, "urlopen", fake_urlopen)
+    client = LLMClient(api_key="k", model="m", base_url="https://example.invalid/v1")
+    return list(client.complete_stream(prompt="hi")), seen["body"]
+
+
+def test_stream_yields_content_deltas_until_done(monkeypatch):
+    chunks, body = _stream(monkeypatch, [
+        ": keep-alive comment",
+        "",
+        "event: message",
+        _chunk(role="assistant"),          # no content: skipped
+        _chunk("Hel"),
+        "",
+        _chunk("lo"),
+        "data: {not json",                 # malformed chunk: skipped
+        "data: " + json.dumps({"choices": []}),
+        "data: " + json.dumps(["not", "a", "dict"]),
+        _chunk(" world"),
+        "data: [DONE]",
+        _chunk("after done"),              # never read
+    ])
+    assert chunks == ["Hel", "lo", " world"]
+    assert body["stream"] is True
+
+
+def test_stream_without_done_ends_at_eof(monkeypatch):
+    chunks, _ = _stream(monkeypatch, [_chunk("a"), "data:" + json.dumps({"choices": [{"delta": {"content": "b"}}]})])
+    assert "".join(chunks) == "ab"
@@ -2,6 +2,7 @@
 """FastAPI backend for RFSN Control Center."""
 from __future__ import annotations
 
+import json
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -106,7 +107,6 @@ SETTINGS_FILE = Path(__file__).parent.parent.parent / "ui_runs" / ".settings.jso
 
 def load_settings() -> Dict[str, str]:
     """Load settings from file."""
-    import json
     if SETTINGS_FILE.exists():
         try:
             with open(SETTINGS_FILE, 'r') as f:
@@ -118,7 +118,6 @@ def load_settings() -> Dict[str, str]:
 
 def save_settings(settings: Dict[str, str]):
     """Save settings to file."""
-    import json
     SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
     with open(SETTINGS_FILE, 'w') as f:
         json.dump(settings, f, indent=2)
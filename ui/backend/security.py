@@ -12,6 +12,7 @@ from __future__ import annotations
 
 import hashlib
 import hmac
+import json
 import os
 import re
 import secrets
@@ -329,7 +330,6 @@ class SecurityAuditLog:
         self._events.append(event)
         
         if self.log_path:
-            import json
             with open(self.log_path, 'a') as f:
                 f.write(json.dumps(event) + '\n')
     
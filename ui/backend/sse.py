@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+from pathlib import Path
 from typing import Any, AsyncGenerator, Dict
 
 
@@ -39,9 +40,6 @@ async def stream_file_tail(
     """
     Stream the tail of a file, yielding new lines as they appear.
     """
-    import os
-    from pathlib import Path
-    
     path = Path(filepath)
     last_pos = 0
     last_size = 0
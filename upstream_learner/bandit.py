@@ -14,6 +14,7 @@ import json
 import math
 import os
 import random
+import sqlite3
 
 
 @dataclass
@@ -193,8 +194,6 @@ def warm_start_from_outcomes(
     Initialize bandit arms from historical outcomes.
     Returns number of rows processed.
     """
-    import sqlite3
-
     if not os.path.exists(db_path):
         return 0
 
@@ -6,13 +6,17 @@ Outcomes database with:
 - Aggregation statistics
 - Recent performance tracking
 - Arm leaderboard
+- Background writer (keeps SQLite commits off the episode loop)
 """
 from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
+import atexit
+import queue
 import sqlite3
 import json
+import threading
 import time
 import os
 
@@ -43,9 +47,14 @@ def ensure_db(path: str) -> None:
         cx.commit()
 
 
-def insert_outcome(
+_INSERT_SQL = (
+    "INSERT INTO outcomes (ts, task_id, arm_id, decision_status, tests_passed, wall_ms, reward, meta_json) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _outcome_record(
     *,
-    db_path: str,
     task_id: str,
     arm_id: str,
     decision_status: str,
@@ -53,10 +62,8 @@ def insert_outcome(
     wall_ms: int,
     reward: float,
     meta: Optional[Dict[str, Any]] = None,
-) -> int:
-    """Insert outcome and return row id."""
-    ensure_db(db_path)
-    rec = (
+) -> Tuple[Any, ...]:
+    return (
         time.time(),
         task_id,
         arm_id,
@@ -66,16 +73,142 @@ def insert_outcome(
         float(reward),
         json.dumps(meta or {}, ensure_ascii=False),
     )
+
+
+def insert_outcome(
+    *,
+    db_path: str,
+    task_id: str,
+    arm_id: str,
+    decision_status: str,
+    tests_passed: bool,
+    wall_ms: int,
+    reward: float,
+    meta: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Insert outcome and return row id."""
+    ensure_db(db_path)
+    rec = _outcome_record(
+        task_id=task_id,
+        arm_id=arm_id,
+        decision_status=decision_status,
+        tests_passed=tests_passed,
+        wall_ms=wall_ms,
+        reward=reward,
+        meta=meta,
+    )
     with sqlite3.connect(db_path) as cx:
-        cur = cx.execute(
-            "INSERT INTO outcomes (ts, task_id, arm_id, decision_status, tests_passed, wall_ms, reward, meta_json) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            rec,
-        )
+        cur = cx.execute(_INSERT_SQL, rec)
         cx.commit()
         return cur.lastrowid or 0
 
 
+class OutcomeWriter:
+    """
+    Asynchronous outcome inserts.
+
+    put() only enqueues; a daemon thread owns a single connection and
+    commits whatever has accumulated in the queue as one transaction.
+    Call flush() before reading the DB back, and close() when done
+    (also registered with atexit so queued rows are not lost).
+
+    If a batch fails to commit, its rows are dropped, the writer keeps
+    draining the queue, and the error is re-raised to the caller by the
+    next put(), flush() or close().
+    """
+
+    def __init__(self, db_path: str, maxsize: int = 1024):
+        ensure_db(db_path)
+        self.db_path = db_path
+        self._q: "queue.Queue[Optional[Tuple[Any, ...]]]" = queue.Queue(maxsize=maxsize)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="outcome-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(
+        self,
+        *,
+        task_id: str,
+        arm_id: str,
+        decision_status: str,
+        tests_passed: bool,
+        wall_ms: int,
+        reward: float,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Queue an outcome. Blocks only if the queue is full (writer fell behind)."""
+        rec = _outcome_record(
+            task_id=task_id,
+            arm_id=arm_id,
+            decision_status=decision_status,
+            tests_passed=tests_passed,
+            wall_ms=wall_ms,
+            reward=reward,
+            meta=meta,
+        )
+        self._raise_pending_error()
+        # Under the lock close() takes, so no row lands behind the sentinel.
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("OutcomeWriter is closed")
+            self._q.put(rec)
+
+    def flush(self) -> None:
+        """Block until every queued outcome has been committed (or failed)."""
+        self._q.join()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        """Flush pending outcomes and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._q.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
+        self._raise_pending_error()
+
+    def _raise_pending_error(self) -> None:
+        err, self._error = self._error, None
+        if err is not None:
+            raise RuntimeError(f"outcome writer failed to commit to {self.db_path}") from err
+
+    def _run(self) -> None:
+        cx: Optional[sqlite3.Connection] = None
+        try:
+            while True:
+                batch = [self._q.get()]
+                while True:
+                    try:
+                        batch.append(self._q.get_nowait())
+                    except queue.Empty:
+                        break
+                rows = [r for r in batch if r is not None]
+                try:
+                    if rows:
+                        if cx is None:
+                            cx = sqlite3.connect(self.db_path, check_same_thread=False)
+                        with cx:
+                            cx.executemany(_INSERT_SQL, rows)
+                except Exception as e:
+                    # Keep serving the queue so put()/flush()/close() never
+                    # block on a dead thread; the caller sees the error next
+                    # call. A failed connect is retried with the next batch.
+                    self._error = e
+                finally:
+                    for _ in batch:
+                        self._q.task_done()
+                if len(rows) != len(batch):
+                    return
+        finally:
+            if cx is not None:
+                cx.close()
+
+
 # === Query Functions ===
 
 